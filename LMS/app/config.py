@@ -0,0 +1,10 @@
+# config.py
+from functools import lru_cache
+from dotenv import load_dotenv
+
+
+@lru_cache(maxsize=None)
+def load_settings() -> bool:
+    """Read .env into os.environ once per process; every module calls this
+    before its os.getenv() lookups, only the first call touches the file."""
+    return load_dotenv()
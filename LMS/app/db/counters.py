@@ -1,23 +1,61 @@
-from app.db.mongodb import db
-
-def get_next_employee_number():
-    counter = db.counters.find_one_and_update(
-        {"_id": "employee_number"},
-        {"$inc": {"seq": 1}},
-        upsert=True,
-        return_document=True
-    )
-    # Format as EMP001, EMP002, etc.
-    return f"EMP{counter['seq']:03d}"
-
-def get_next_manager_number():
-    counter = db.counters.find_one_and_update(
-        {"_id": "manager_number"},
-        {"$inc": {"seq": 1}},
-        upsert=True,
-        return_document=True
-    )
-    # Format as MAN001, MAN002, etc.
-    return f"MAN{counter['seq']:03d}"
+"""
+Readable sequential ids (EMP001, MAN001, ...) via hi/lo block leasing.
 
+Each process leases ID_BLOCK_SIZE numbers at a time with one atomic $inc
+on its `counters` document and hands them out locally, so only one in
+ID_BLOCK_SIZE allocations touches the database. Blocks never overlap
+across workers or instances; numbers left in a block when a process
+exits are skipped (ids stay unique, not gap-free).
+"""
+import os
+import asyncio
+from pymongo import ReturnDocument
+from app.db.mongodb import lazy_collection
 
+ID_BLOCK_SIZE = int(os.getenv("ID_BLOCK_SIZE", "50"))
+
+
+class BlockAllocator:
+    def __init__(self, counter_id: str, prefix: str, block_size: int = ID_BLOCK_SIZE, collection=None):
+        self.counter_id = counter_id
+        self.prefix = prefix
+        self.block_size = max(1, block_size)
+        self.collection = collection if collection is not None else lazy_collection("counters")
+        self._next = 0
+        self._high = 0  # last number in the leased block
+        self._lock = asyncio.Lock()
+
+    async def _lease(self):
+        # `seq` is the highest number handed out to any process
+        counter = await self.collection.find_one_and_update(
+            {"_id": self.counter_id},
+            {"$inc": {"seq": self.block_size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._high = counter["seq"]
+        self._next = self._high - self.block_size + 1
+
+    async def next_number(self) -> int:
+        async with self._lock:
+            if self._next == 0 or self._next > self._high:
+                await self._lease()
+            number = self._next
+            self._next += 1
+            return number
+
+    async def next_id(self) -> str:
+        # Format as EMP001, EMP002, etc.
+        return f"{self.prefix}{await self.next_number():03d}"
+
+
+employee_ids = BlockAllocator("employee_number", "EMP")
+manager_ids = BlockAllocator("manager_number", "MAN")
+
+
+async def get_next_employee_number():
+    return await employee_ids.next_id()
+
+
+async def get_next_manager_number():
+    return await manager_ids.next_id()
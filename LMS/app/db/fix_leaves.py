@@ -0,0 +1,175 @@
+"""
+Normalise leave_applications documents for the frontend.
+
+Fills missing string fields, dates and status, and recounts `days` as
+working days on the department's holiday calendar (at least 1: a leave
+that now covers no working day, e.g. after a holiday was added, is
+counted and reported rather than zeroed). The collection is
+streamed in _id order with a projection and fixes go out as bulk_write
+batches; the last processed _id is checkpointed in `migrations` after
+every batch so an interrupted run picks up where it stopped. A run that
+changed any `days` rebuilds leave_balances when it finishes (unless
+--skip-balances, which prints the rebuild command instead).
+
+    python -m app.db.fix_leaves                    # fix (resumes from checkpoint)
+    python -m app.db.fix_leaves --dry-run          # report only, no writes
+    python -m app.db.fix_leaves --restart          # ignore the checkpoint
+    python -m app.db.fix_leaves --skip-balances    # leave the balance rebuild to you
+"""
+import time
+import asyncio
+import argparse
+from datetime import datetime
+from pymongo import UpdateOne
+from app.db.mongodb import get_sync_db
+from app.services.balance_service import rebuild_balances
+from app.services.version_service import reset_leave_versions
+from app.utils.business_days import business_days
+
+MIGRATION_ID = "fix_leaves"
+LEAVE_STATUSES = ["Pending", "Approved", "Rejected"]
+STRING_DEFAULTS = [
+    ("employee_id", "-"),
+    ("employee_name", "-"),
+    ("employee_email", "-"),
+    ("employee_dept", "-"),
+    ("title", "-"),
+    ("description", "-"),
+]
+PROJECTION = {field: 1 for field, _ in STRING_DEFAULTS}
+PROJECTION.update({"start_date": 1, "end_date": 1, "days": 1, "status": 1})
+
+
+def leave_fixes(lv: dict, now: datetime, stats: dict = None) -> dict:
+    """$set document bringing one leave up to the current shape.
+
+    Counts leaves with no working days in stats["no_working_days"].
+    """
+    updated_fields = {}
+
+    # Required string fields
+    for field, default in STRING_DEFAULTS:
+        if lv.get(field) is None:
+            updated_fields[field] = default
+
+    # Dates (fallback to now if missing)
+    for date_field in ["start_date", "end_date"]:
+        if not isinstance(lv.get(date_field), datetime):
+            updated_fields[date_field] = now
+
+    # Days (working days on the department's holiday calendar)
+    start = updated_fields.get("start_date", lv.get("start_date"))
+    end = updated_fields.get("end_date", lv.get("end_date"))
+    working_days = business_days(start, end, updated_fields.get("employee_dept", lv.get("employee_dept")))
+    if working_days == 0 and stats is not None:
+        stats["no_working_days"] += 1
+    # submit_leave never accepts a 0-day leave; keep existing ones countable
+    working_days = max(1, working_days)
+    if lv.get("days") != working_days:
+        updated_fields["days"] = working_days
+
+    # Status
+    if lv.get("status") not in LEAVE_STATUSES:
+        updated_fields["status"] = "Pending"
+
+    return updated_fields
+
+
+def fix_leaves(batch_size: int = 1000, dry_run: bool = False, restart: bool = False, report_every: int = 10) -> dict:
+    db = get_sync_db()
+    leaves = db["leave_applications"]
+    migrations = db["migrations"]
+
+    query = {}
+    checkpoint = None if restart else migrations.find_one({"_id": MIGRATION_ID})
+    if checkpoint and checkpoint.get("last_id") is not None:
+        query["_id"] = {"$gt": checkpoint["last_id"]}
+        print(f"↪️  Resuming after _id {checkpoint['last_id']}")
+
+    stats = {"scanned": 0, "fixed": 0, "batches": 0, "days_changed": 0, "no_working_days": 0}
+    batch = []
+    # Balances are stale once any batch changed `days`, also across resumed runs
+    balances_stale = bool(checkpoint and checkpoint.get("balances_stale"))
+    started = time.perf_counter()
+    now = datetime.utcnow()
+
+    def flush(last_id):
+        if batch and not dry_run:
+            leaves.bulk_write(batch, ordered=False)
+        stats["fixed"] += len(batch)
+        stats["batches"] += 1
+        batch.clear()
+        if not dry_run:
+            migrations.update_one(
+                {"_id": MIGRATION_ID},
+                {"$set": {"last_id": last_id, "balances_stale": balances_stale, "updated_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        if stats["batches"] % report_every == 0:
+            elapsed = time.perf_counter() - started
+            print(f"… {stats['scanned']} scanned, {stats['fixed']} fixed, {stats['scanned'] / elapsed:,.0f} docs/sec")
+
+    last_id = None
+    in_batch = 0
+    for lv in leaves.find(query, PROJECTION).sort("_id", 1).batch_size(batch_size):
+        stats["scanned"] += 1
+        in_batch += 1
+        last_id = lv["_id"]
+        updated_fields = leave_fixes(lv, now, stats)
+        if "days" in updated_fields:
+            stats["days_changed"] += 1
+            balances_stale = True  # persisted with the checkpoint once this batch is written
+        if updated_fields:
+            batch.append(UpdateOne({"_id": lv["_id"]}, {"$set": updated_fields}))
+        if in_batch >= batch_size:
+            flush(last_id)
+            in_batch = 0
+    if in_batch:
+        flush(last_id)
+
+    # A finished run starts from the beginning next time
+    if not dry_run:
+        reset_leave_versions(db)  # cached list ETags no longer describe the data
+        migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"last_id": None, "balances_stale": balances_stale, "completed_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    stats["balances_stale"] = balances_stale
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["docs_per_sec"] = round(stats["scanned"] / elapsed) if elapsed else 0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fix leave documents for frontend compatibility")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="count fixes without writing")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved checkpoint")
+    parser.add_argument("--skip-balances", action="store_true", help="don't rebuild leave_balances afterwards")
+    args = parser.parse_args(argv)
+
+    stats = fix_leaves(args.batch_size, args.dry_run, args.restart)
+    print(f"✅ Scanned {stats['scanned']}, fixed {stats['fixed']} in {stats['seconds']}s "
+          f"({stats['docs_per_sec']:,} docs/sec)" + (" (dry run)" if args.dry_run else ""))
+    if stats["no_working_days"]:
+        print(f"⚠️  {stats['no_working_days']} leave(s) cover no working days; days kept at 1, review them")
+    if args.dry_run:
+        if stats["days_changed"]:
+            print(f"ℹ️  {stats['days_changed']} leave(s) would change days; leave_balances is rebuilt after a real run")
+        return
+    if not stats["balances_stale"]:
+        return
+    if args.skip_balances:
+        print("⚠️  leave days changed; leave_balances is stale until you run "
+              "`python -m app.services.balance_service --rebuild`")
+        return
+    count = asyncio.run(rebuild_balances())
+    get_sync_db().migrations.update_one({"_id": MIGRATION_ID}, {"$set": {"balances_stale": False}})
+    print(f"✅ Rebuilt {count} leave balance document(s)")
+
+
+if __name__ == "__main__":
+    main()
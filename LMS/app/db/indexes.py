@@ -0,0 +1,151 @@
+"""
+Index bootstrap for the LMS collections.
+
+Declares every index the API relies on, creates them idempotently at
+startup (see main.py) and can be run by hand:
+
+    python -m app.db.indexes           # ensure indexes
+    python -m app.db.indexes --check   # ensure + fail on any COLLSCAN
+"""
+import sys
+import asyncio
+import argparse
+from pymongo import IndexModel, ASCENDING
+from pymongo.errors import OperationFailure
+from app.db.mongodb import db
+from app.utils.logger import logger
+
+# ==========================
+# Declared indexes
+# ==========================
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        # EMP###/MAN### ids from app/db/counters.py; sparse: each user has only one of them
+        IndexModel([("employee_id", ASCENDING)], name="employee_id_unique", unique=True, sparse=True),
+        IndexModel([("manager_id", ASCENDING)], name="manager_id_unique", unique=True, sparse=True),
+        IndexModel([("role", ASCENDING), ("_id", ASCENDING)], name="role_id"),
+        # Department headcount for coverage checks
+        IndexModel([("department", ASCENDING), ("role", ASCENDING)], name="department_role"),
+    ],
+    "leave_applications": [
+        IndexModel([("employee_id", ASCENDING), ("start_date", ASCENDING)], name="employee_start"),
+        IndexModel(
+            [("status", ASCENDING), ("submitted_at", ASCENDING), ("_id", ASCENDING)],
+            name="status_submitted",
+        ),
+        IndexModel([("start_date", ASCENDING), ("_id", ASCENDING)], name="start_id"),
+        # Event polling fallback on standalone MongoDB (events_service._poll)
+        IndexModel([("submitted_at", ASCENDING)], name="submitted_at"),
+        IndexModel([("decided_at", ASCENDING)], name="decided_at", sparse=True),
+        # Manager history (status in Approved/Rejected) paged by start_date
+        IndexModel(
+            [("status", ASCENDING), ("start_date", ASCENDING), ("_id", ASCENDING)],
+            name="status_start",
+        ),
+        # Department analytics / coverage over a date window
+        IndexModel([("employee_dept", ASCENDING), ("start_date", ASCENDING)], name="dept_start"),
+    ],
+}
+
+# Hot queries issued by the routers: (collection, filter, sort)
+KNOWN_QUERIES = [
+    ("users", {"email": "probe@example.com"}, None),
+    ("users", {"role": "Employee"}, [("_id", ASCENDING)]),
+    ("leave_applications", {"employee_id": "probe"}, None),
+    ("leave_applications", {"status": "Pending"}, [("submitted_at", ASCENDING), ("_id", ASCENDING)]),
+    ("leave_applications", {}, [("start_date", ASCENDING), ("_id", ASCENDING)]),
+    (
+        "leave_applications",
+        {"status": {"$in": ["Approved", "Rejected"]}},
+        [("start_date", ASCENDING), ("_id", ASCENDING)],
+    ),
+]
+
+PROGRESS_POLL_SECONDS = 2
+
+
+# ==========================
+# Ensure indexes
+# ==========================
+async def _report_build_progress():
+    """Log in-progress createIndexes operations until cancelled."""
+    while True:
+        await asyncio.sleep(PROGRESS_POLL_SECONDS)
+        try:
+            ops = await db.client.admin.aggregate([
+                {"$currentOp": {"allUsers": True, "idleConnections": False}},
+                {"$match": {"command.createIndexes": {"$exists": True}}},
+            ]).to_list(length=None)
+        except (OperationFailure, NotImplementedError):
+            # $currentOp needs privileges (or a real server); skip reporting
+            return
+        for op in ops:
+            progress = op.get("progress") or {}
+            logger.info(
+                "Index build on %s: %s (%s/%s)",
+                op["command"].get("createIndexes"),
+                op.get("msg", "running"),
+                progress.get("done", "?"),
+                progress.get("total", "?"),
+            )
+
+
+async def ensure_indexes(database=db) -> dict:
+    """Create every declared index; already-existing indexes are a no-op."""
+    reporter = asyncio.create_task(_report_build_progress())
+    created = {}
+    try:
+        for name, models in INDEXES.items():
+            logger.info("Ensuring %d index(es) on %s", len(models), name)
+            created[name] = await database[name].create_indexes(models)
+    finally:
+        reporter.cancel()
+    logger.info("Indexes ready: %s", created)
+    return created
+
+
+# ==========================
+# Explain-plan check
+# ==========================
+def _plan_stages(plan: dict):
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        yield from _plan_stages(plan.get(key))
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+async def check_query_plans(database=db) -> list:
+    """Explain each known query; returns a list of COLLSCAN offenders."""
+    offenders = []
+    for name, query, sort in KNOWN_QUERIES:
+        cursor = database[name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in set(_plan_stages(winning)):
+            offenders.append({"collection": name, "filter": query, "sort": sort})
+            logger.error("COLLSCAN on %s for filter=%s sort=%s", name, query, sort)
+    return offenders
+
+
+# ==========================
+# CLI
+# ==========================
+async def _main(check: bool) -> int:
+    await ensure_indexes()
+    if check and await check_query_plans():
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ensure LMS MongoDB indexes")
+    parser.add_argument("--check", action="store_true", help="fail if a known query does a COLLSCAN")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_main(args.check)))
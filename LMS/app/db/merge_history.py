@@ -0,0 +1,62 @@
+"""
+Merge the legacy leave_history collection into leave_applications.
+
+Approved/rejected leaves used to be copied to leave_history and deleted
+from leave_applications. They now stay in leave_applications with their
+final status, so this folds the old copies back in (keeping their _id).
+Safe to rerun: documents already present are skipped.
+
+    python -m app.db.merge_history                 # merge
+    python -m app.db.merge_history --dry-run       # count only
+    python -m app.db.merge_history --drop-history  # merge, then drop leave_history
+"""
+import argparse
+from pymongo import UpdateOne
+from app.db.mongodb import get_sync_db
+from app.services.version_service import reset_leave_versions
+
+
+def merge_history(batch_size: int = 1000, dry_run: bool = False, drop_history: bool = False) -> dict:
+    db = get_sync_db()
+    history = db["leave_history"]
+    leaves = db["leave_applications"]
+
+    stats = {"scanned": 0, "inserted": 0, "skipped": 0}
+    batch = []
+
+    def flush():
+        if not batch:
+            return
+        if not dry_run:
+            # $setOnInsert never overwrites a document that already exists
+            result = leaves.bulk_write(batch, ordered=False)
+            stats["inserted"] += result.upserted_count
+            stats["skipped"] += len(batch) - result.upserted_count
+        batch.clear()
+
+    for doc in history.find({}).sort("_id", 1).batch_size(batch_size):
+        stats["scanned"] += 1
+        doc_id = doc.pop("_id")
+        doc.setdefault("status", "Approved")
+        batch.append(UpdateOne({"_id": doc_id}, {"$setOnInsert": doc}, upsert=True))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    if not dry_run and stats["inserted"]:
+        reset_leave_versions(db)  # cached list ETags no longer describe the data
+    if drop_history and not dry_run:
+        history.drop()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge leave_history into leave_applications")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--drop-history", action="store_true", help="drop leave_history after merging")
+    args = parser.parse_args()
+
+    stats = merge_history(args.batch_size, args.dry_run, args.drop_history)
+    print(f"✅ Scanned {stats['scanned']}, inserted {stats['inserted']}, already present {stats['skipped']}"
+          + (" (dry run)" if args.dry_run else ""))
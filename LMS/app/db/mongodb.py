@@ -1,14 +1,241 @@
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient, monitoring
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
 import os
-from dotenv import load_dotenv
+import time
+import asyncio
+from app.config import load_settings
+from app.utils.metrics import mongo_event_listeners
 
-load_dotenv()
+load_settings()
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-client = MongoClient(MONGO_URI)
-db = client["leave_management"]  # database name
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "leave_management")
+
+# ==============================
+# Connection pool settings
+# ==============================
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "0")) or None
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "20000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "0")) or None
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "0")) or None
+MONGO_PING_TIMEOUT_SECONDS = float(os.getenv("MONGO_PING_TIMEOUT_SECONDS", "2"))
+
+# ==============================
+# Read routing for list / analytics reads (writes always go to the primary)
+# ==============================
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+MONGO_MAX_STALENESS_SECONDS = int(os.getenv("MONGO_MAX_STALENESS_SECONDS", "-1"))  # -1: no limit, else >= 90
+MONGO_READ_CONCERN = os.getenv("MONGO_READ_CONCERN", "")  # "", local, available, majority
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Open / checked-out connection counts for /healthz (plain counters)."""
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.created = 0
+
+    def connection_created(self, event):
+        self.open += 1
+        self.created += 1
+
+    def connection_closed(self, event):
+        self.open -= 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+    # Remaining ConnectionPoolListener hooks are not needed
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): pass
+
+
+pool_stats = PoolStats()
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primarypreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondarypreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def readonly_options() -> dict:
+    """with_options() kwargs for the read-only handles, from MONGO_READ_* settings."""
+    mode = READ_PREFERENCES.get(MONGO_READ_PREFERENCE.replace("_", "").lower())
+    if mode is None:
+        raise ValueError(f"Unknown MONGO_READ_PREFERENCE {MONGO_READ_PREFERENCE!r}")
+    # Primary takes no staleness bound
+    options = {"read_preference": mode() if mode is Primary else mode(max_staleness=MONGO_MAX_STALENESS_SECONDS)}
+    if MONGO_READ_CONCERN:
+        options["read_concern"] = ReadConcern(MONGO_READ_CONCERN)
+    return options
+
+
+def client_options() -> dict:
+    """Pool/timeout kwargs (and metrics listener) shared by the async client and the sync shim."""
+    return {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "event_listeners": mongo_event_listeners(),
+    }
+
+
+# ==============================
+# Async client (used by the API), created on first use
+# ==============================
+_client = None
+
+
+def get_client() -> AsyncIOMotorClient:
+    global _client
+    if _client is None:
+        options = client_options()
+        options["event_listeners"] = options["event_listeners"] + [pool_stats]
+        _client = AsyncIOMotorClient(MONGO_URI, **options)
+    return _client
+
+
+def get_database():
+    return get_client()[MONGO_DB_NAME]
+
+
+class _LazyDatabase:
+    """Module-level `db` that binds to the client only when first used."""
+
+    def __getitem__(self, name):
+        return get_database()[name]
+
+    def __getattr__(self, name):
+        return getattr(get_database(), name)
+
+
+_collections = []
+
+
+class _LazyCollection:
+    """Module-level collection handle; resolved (and cached) on first use."""
+
+    def __init__(self, name: str, readonly: bool = False):
+        self._name = name
+        self._readonly = readonly
+        self._collection = None
+        _collections.append(self)
+
+    def _resolve(self):
+        if self._collection is None:
+            collection = get_database()[self._name]
+            if self._readonly:
+                collection = collection.with_options(**readonly_options())
+            self._collection = collection
+        return self._collection
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+
+def lazy_collection(name: str, readonly: bool = False) -> _LazyCollection:
+    """Collection handle safe to create at import time (no client yet).
+
+    readonly=True routes reads by MONGO_READ_PREFERENCE / MONGO_READ_CONCERN;
+    use it only where a slightly stale read is fine, never for writes.
+    """
+    return _LazyCollection(name, readonly)
+
+
+db = _LazyDatabase()
 
 # collections
-users_collection = db["users"]
-leave_collection = db["leave_applications"]
-leave_collection_history = db["leave_history"]
\ No newline at end of file
+users_collection = lazy_collection("users")
+leave_collection = lazy_collection("leave_applications")
+# legacy: decided leaves used to be copied here; see app/db/merge_history.py
+leave_collection_history = lazy_collection("leave_history")
+# read-only handles for manager lists and analytics (may lag the primary)
+users_collection_readonly = lazy_collection("users", readonly=True)
+leave_collection_readonly = lazy_collection("leave_applications", readonly=True)
+
+
+# ==============================
+# Lifespan hooks
+# ==============================
+mongo_state = {"ready": False, "connect_ms": None, "last_ping_ms": None, "error": None}
+
+
+async def ping() -> bool:
+    """One bounded ping; updates mongo_state for /healthz and /readyz."""
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(get_client().admin.command("ping"), MONGO_PING_TIMEOUT_SECONDS)
+    except Exception as e:
+        mongo_state.update(ready=False, error=str(e) or type(e).__name__)
+        return False
+    mongo_state.update(ready=True, error=None, last_ping_ms=round((time.perf_counter() - started) * 1000, 2))
+    return True
+
+
+async def connect_mongo() -> bool:
+    """Create the client, ping, and open minPoolSize connections up front."""
+    started = time.perf_counter()
+    if not await ping():
+        return False
+    if MONGO_MIN_POOL_SIZE > 1:
+        # Concurrent pings each check out their own connection
+        await asyncio.gather(*[ping() for _ in range(MONGO_MIN_POOL_SIZE - 1)], return_exceptions=True)
+    mongo_state["connect_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return True
+
+
+def close_mongo():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+    for collection in _collections:
+        collection._collection = None
+    mongo_state.update(ready=False)
+
+
+def pool_state() -> dict:
+    return {
+        **mongo_state,
+        "open_connections": pool_stats.open,
+        "checked_out": pool_stats.checked_out,
+        "connections_created": pool_stats.created,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "read_preference": MONGO_READ_PREFERENCE,
+    }
+
+
+# ==============================
+# Sync shim (scripts like fix_leaves.py)
+# ==============================
+_sync_client = None
+
+
+def get_sync_db():
+    """Blocking pymongo handle on the same database, created on first use."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = MongoClient(MONGO_URI, **client_options())
+    return _sync_client[MONGO_DB_NAME]
@@ -1,56 +1,12 @@
-from pymongo import MongoClient
-from datetime import datetime
+# Kept for existing run instructions; the migration lives in app/db/fix_leaves.py
+# (batched, resumable, --dry-run). See `python -m app.db.fix_leaves --help`.
 import os
-from dotenv import load_dotenv
+import sys
 
-load_dotenv()
+# Run as `python app/fix_leaves.py`, sys.path[0] is LMS/app; the `app` package needs LMS/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# ---------------------------
-# Connect to MongoDB
-# ---------------------------
-MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-client = MongoClient(MONGO_URI)
-db = client["leave_management"]
-leave_collection = db["leave_applications"]
+from app.db.fix_leaves import main
 
-# ---------------------------
-# Fix existing leave documents
-# ---------------------------
-leaves = list(leave_collection.find({}))
-for lv in leaves:
-    updated_fields = {}
-
-    # Required string fields
-    for field, default in [
-        ("employee_id", "-"),
-        ("employee_name", "-"),
-        ("employee_email", "-"),
-        ("employee_dept", "-"),
-        ("title", "-"),
-        ("description", "-"),
-    ]:
-        if field not in lv or lv[field] is None:
-            updated_fields[field] = default
-
-    # Dates
-    for date_field in ["start_date", "end_date"]:
-        if date_field not in lv or not isinstance(lv[date_field], datetime):
-            # fallback to today if missing
-            updated_fields[date_field] = datetime.utcnow()
-
-    # Days
-    if "days" not in lv or not isinstance(lv["days"], int):
-        start = updated_fields.get("start_date", lv.get("start_date", datetime.utcnow()))
-        end = updated_fields.get("end_date", lv.get("end_date", datetime.utcnow()))
-        delta = (end - start).days + 1
-        updated_fields["days"] = max(delta, 1)
-
-    # Status
-    if "status" not in lv or lv["status"] not in ["Pending", "Approved", "Rejected"]:
-        updated_fields["status"] = "Pending"
-
-    if updated_fields:
-        leave_collection.update_one({"_id": lv["_id"]}, {"$set": updated_fields})
-        print(f"Updated leave {_id}: {updated_fields}")
-
-print("✅ All leave documents fixed for frontend compatibility.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
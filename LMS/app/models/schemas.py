@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import Optional, List, Literal, Union
+from datetime import date
 
 # Reusable user create input
 class UserCreateInput(BaseModel):
@@ -37,5 +38,63 @@ class LeaveRequest(BaseModel):
     leaveTitle: str
     startDate: str
     endDate: str
+    days: Optional[int] = None  # recomputed server-side from the holiday calendar
+    description: str
+    leaveType: Optional[str] = "General"
+
+
+class LeaveDecision(BaseModel):
+    leave_id: str
+    decision: Literal["approve", "reject"]
+
+
+class BulkLeaveDecisionInput(BaseModel):
+    decisions: List[LeaveDecision]
+    force: bool = False  # approve past the department coverage limit
+
+
+# List rows (documented shapes; the endpoints serialize them with orjson directly)
+class MyLeaveRow(BaseModel):
+    leaveId: str
+    leaveTitle: str
+    startDate: Union[date, str]
+    endDate: Union[date, str]
     days: int
     description: str
+    status: str
+
+
+class LeaveHistoryRow(BaseModel):
+    id: str
+    leaveTitle: str
+    employee_name: str
+    startDate: Union[date, str]
+    endDate: Union[date, str]
+    status: str
+
+
+class PendingLeaveRow(BaseModel):
+    id: str = Field(alias="_id")
+    leaveTitle: str
+    employee_name: str
+    startDate: Union[date, str]
+    endDate: Union[date, str]
+    status: str
+
+
+class EmployeeRow(BaseModel):
+    employee_id: str
+    name: str
+    email: str
+    department: str
+    status: str
+
+
+class EmployeeLeaveRow(BaseModel):
+    id: str
+    employee_name: str
+    employee_id: str
+    leaveTitle: str
+    startDate: Union[date, str]
+    endDate: Union[date, str]
+    status: str
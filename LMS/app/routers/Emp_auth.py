@@ -1,15 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.models.schemas import UserCreateInput, SignupResponse, LoginInput, LoginTokenOutput, LeaveRequest
-from app.services.auth_service import create_user, authenticate_user, submit_leave, get_current_user
-from app.db.mongodb import leave_collection, leave_collection_history, users_collection
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from app.models.schemas import UserCreateInput, SignupResponse, LoginInput, LoginTokenOutput, LeaveRequest, MyLeaveRow
+from app.services.auth_service import create_user, authenticate_user, submit_leave, get_current_user, principal_from_token
+from app.db.mongodb import leave_collection, users_collection
+from app.services.principal_cache import invalidate_principal
+from app.services.balance_service import get_balance
+from app.services.conflict_service import coverage_report
+from app.services.events_service import sse_stream
+from app.services.version_service import employee_scope, list_etag, not_modified, etag_headers
+from app.utils.responses import FastJSONResponse
 from bson import ObjectId
+from datetime import datetime
+from typing import Optional, List
 router = APIRouter(prefix="/api/v1/Emp_auth", tags=["Auth"])
 Emp_router = APIRouter(prefix="/api/v1/Emp_Dash", tags=["Dashboard"])
 
 # ==========================
 # Current Employee
 # ==========================
-def get_current_employee(user: dict = Depends(get_current_user)):
+async def get_current_employee(user: dict = Depends(get_current_user)):
     if user.get("role") != "Employee":
         raise HTTPException(status_code=403, detail="Not authorized")
     return user
@@ -18,15 +27,16 @@ def get_current_employee(user: dict = Depends(get_current_user)):
 # Employee Signup & Login
 # ==========================
 @router.post("/Employee_signup", response_model=SignupResponse)
-def employee_signup(data: UserCreateInput):
+async def employee_signup(data: UserCreateInput):
     try:
-        user = create_user(**data.dict(), role="Employee")
+        user = await create_user(**data.dict(), role="Employee")
     except HTTPException as e:
         raise e
     except Exception as e:
         # If partially inserted, remove
         if 'user' in locals() and user.get("user", {}).get("user_id"):
-            users_collection.delete_one({"_id": ObjectId(user["user"]["user_id"])})
+            await users_collection.delete_one({"_id": ObjectId(user["user"]["user_id"])})
+            invalidate_principal(user["user"]["user_id"])
         raise HTTPException(status_code=500, detail=str(e))
 
     # Map `department` -> `dept` for Pydantic
@@ -41,8 +51,8 @@ def employee_signup(data: UserCreateInput):
 
 
 @router.post("/Employee_login", response_model=LoginTokenOutput)
-def employee_login(data: LoginInput):
-    user = authenticate_user(data.email, data.password)
+async def employee_login(data: LoginInput):
+    user = await authenticate_user(data.email, data.password)
 
     # Map `department` -> `dept` for Pydantic
     response_user = user["user"].copy()
@@ -59,8 +69,8 @@ def employee_login(data: LoginInput):
 # Submit Leave
 # ==========================
 @Emp_router.post("/submit")
-def submit_leave_endpoint(data: LeaveRequest, current_user: dict = Depends(get_current_employee)):
-    leave_doc = submit_leave(
+async def submit_leave_endpoint(data: LeaveRequest, current_user: dict = Depends(get_current_employee)):
+    leave_doc = await submit_leave(
         employee_id=current_user.get("employee_id", "Unknown"),
         employee_name=current_user.get("name", "Unknown"),
         employee_email=current_user.get("email", ""),
@@ -69,41 +79,60 @@ def submit_leave_endpoint(data: LeaveRequest, current_user: dict = Depends(get_c
         startDate=data.startDate,
         endDate=data.endDate,
         days=data.days or 1,
-        description=data.description or ""
+        description=data.description or "",
+        leave_type=data.leaveType
     )
     # Convert Mongo _id to string for frontend
     leave_doc["_id"] = str(leave_doc.get("_id"))
-    return {"message": "Leave submitted", "leave": leave_doc}
+
+    # Team coverage for the requested window (names of colleagues omitted)
+    coverage = await coverage_report(
+        leave_doc["employee_dept"], leave_doc["start_date"], leave_doc["end_date"], include_leaves=False
+    )
+    return {"message": "Leave submitted", "leave": leave_doc, "coverage": coverage}
 
 # ==========================
 # Get My Leaves
 # ==========================
-@Emp_router.get("/my_leaves")
-def get_my_leaves(current_user: dict = Depends(get_current_employee)):
-    active_leaves = list(leave_collection.find({"employee_id": current_user["employee_id"]}))
-    history_leaves = list(leave_collection_history.find({"employee_id": current_user["employee_id"]}))
-    all_leaves = active_leaves + history_leaves
-
-    leaves = []
-    for lv in all_leaves:
-        start = lv.get("start_date")
-        end = lv.get("end_date")
-        leaves.append({
-            "leaveId": str(lv.get("_id")),
-            "leaveTitle": lv.get("title", "Untitled Application"),
-            "startDate": start.strftime("%Y-%m-%d") if start else "",
-            "endDate": end.strftime("%Y-%m-%d") if end else "",
-            "days": lv.get("days") or 1,
-            "description": lv.get("description", ""),
-            "status": lv.get("status", "Pending")
-        })
-    return leaves
+MY_LEAVES_PROJECTION = {"title": 1, "start_date": 1, "end_date": 1, "days": 1, "description": 1, "status": 1}
+
+
+@Emp_router.get("/my_leaves", response_model=List[MyLeaveRow])
+async def get_my_leaves(request: Request, current_user: dict = Depends(get_current_employee)):
+    # Polled by the dashboard: answer 304 from the version counter when nothing changed
+    etag = await list_etag(request, employee_scope(current_user["employee_id"]))
+    cached = not_modified(request, etag, "my_leaves")
+    if cached is not None:
+        return cached
+
+    all_leaves = await leave_collection.find(
+        {"employee_id": current_user["employee_id"]}, MY_LEAVES_PROJECTION
+    ).to_list(length=None)
+
+    # Native date / ObjectId values; FastJSONResponse encodes each row once
+    leaves = [{
+        "leaveId": lv["_id"],
+        "leaveTitle": lv.get("title", "Untitled Application"),
+        "startDate": lv["start_date"].date() if lv.get("start_date") else "",
+        "endDate": lv["end_date"].date() if lv.get("end_date") else "",
+        "days": lv.get("days") or 1,
+        "description": lv.get("description", ""),
+        "status": lv.get("status", "Pending")
+    } for lv in all_leaves]
+    return FastJSONResponse(leaves, headers=etag_headers(etag))
+
+# ==========================
+# My Leave Balance
+# ==========================
+@Emp_router.get("/balance")
+async def get_my_balance(year: Optional[int] = None, current_user: dict = Depends(get_current_employee)):
+    return await get_balance(current_user["employee_id"], year or datetime.now().year)
 
 # ==========================
 # Employee Profile
 # ==========================
 @router.get("/me")
-def get_employee_profile(current_user: dict = Depends(get_current_employee)):
+async def get_employee_profile(current_user: dict = Depends(get_current_employee)):
     return {
         "user_id": current_user.get("user_id"),
         "employee_id": current_user.get("employee_id"),
@@ -111,3 +140,19 @@ def get_employee_profile(current_user: dict = Depends(get_current_employee)):
         "email": current_user.get("email", ""),
         "department": current_user.get("department", "")
     }
+
+
+# ==========================
+# Live leave updates (SSE)
+# ==========================
+@Emp_router.get("/events")
+async def employee_events(request: Request, token: str):
+    # EventSource cannot send headers, so the JWT comes as ?token=
+    user = await principal_from_token(token)
+    if user.get("role") != "Employee":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return StreamingResponse(
+        sse_stream(request, employee_id=user.get("employee_id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,20 +1,42 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from app.models.schemas import UserCreateInput, SignupResponse, LoginInput, LoginTokenOutput
-from app.services.auth_service import create_user, authenticate_user, get_current_user
-from app.db.mongodb import leave_collection, users_collection, leave_collection_history
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from fastapi.responses import HTMLResponse, StreamingResponse
+from app.models.schemas import (
+    UserCreateInput, SignupResponse, LoginInput, LoginTokenOutput, BulkLeaveDecisionInput,
+    LeaveHistoryRow, PendingLeaveRow, EmployeeRow, EmployeeLeaveRow
+)
+from app.services.auth_service import (
+    create_user, authenticate_user, get_current_user, decide_leave, decide_leaves_bulk, LEAVE_DECISIONS,
+    import_employees, BULK_IMPORT_MAX, principal_from_token
+)
+from app.db.mongodb import leave_collection, users_collection, leave_collection_readonly, users_collection_readonly
+from app.services.principal_cache import invalidate_principal
+from app.services.balance_service import get_balance
+from app.services.analytics_service import get_leave_analytics
+from app.services.conflict_service import coverage_report, coverage_conflict_detail
+from app.services.calendar_service import get_team_calendar, CALENDAR_MAX_MONTHS
+from app.services.events_service import sse_stream
+from app.services.version_service import GLOBAL_SCOPE, list_etag, not_modified, etag_headers
+from app.utils.static_assets import get_page
+from app.utils.responses import FastJSONResponse, compressed_json_response, dumps
+from app.utils.pagination import (
+    PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, NEXT_CURSOR_HEADER, encode_cursor, keyset_filter,
+    sort_spec, merge_filters, date_range_filter, parse_date
+)
 from bson import ObjectId
 from datetime import datetime
+from typing import Optional, List
+import json
+import csv
+import io
+import zlib
 
-templates = Jinja2Templates(directory="app/templates")
 router = APIRouter(prefix="/api/v1/Man_auth", tags=["Auth"])
 Man_router = APIRouter(prefix="/api/v1/Man_Dash", tags=["Dashboard"])
 
 # ==========================
 # Current Manager
 # ==========================
-def get_current_manager(user: dict = Depends(get_current_user)):
+async def get_current_manager(user: dict = Depends(get_current_user)):
     if user.get("role") != "Manager":
         raise HTTPException(status_code=403, detail="Not authorized")
     return user
@@ -23,15 +45,16 @@ def get_current_manager(user: dict = Depends(get_current_user)):
 # Manager Signup & Login
 # ==========================
 @router.post("/Manager_signup", response_model=SignupResponse)
-def manager_signup(data: UserCreateInput):
+async def manager_signup(data: UserCreateInput):
     try:
-        user = create_user(**data.dict(), role="Manager")
+        user = await create_user(**data.dict(), role="Manager")
     except HTTPException as e:
         raise e
     except Exception as e:
         # If partially inserted, remove
         if 'user' in locals() and user.get("user", {}).get("user_id"):
-            users_collection.delete_one({"_id": ObjectId(user["user"]["user_id"])})
+            await users_collection.delete_one({"_id": ObjectId(user["user"]["user_id"])})
+            invalidate_principal(user["user"]["user_id"])
         raise HTTPException(status_code=500, detail=str(e))
 
     # Map `department` -> `dept` for Pydantic
@@ -47,8 +70,8 @@ def manager_signup(data: UserCreateInput):
 
 
 @router.post("/Manager_login", response_model=LoginTokenOutput)
-def manager_login(data: LoginInput):
-    user = authenticate_user(data.email, data.password)
+async def manager_login(data: LoginInput):
+    user = await authenticate_user(data.email, data.password)
 
     # Map `department` -> `dept` for Pydantic
     response_user = user["user"].copy()
@@ -66,126 +89,397 @@ def manager_login(data: LoginInput):
 # Manager Dashboard (HTML)
 # ==========================
 @Man_router.get("/Manager_Dashboard", response_class=HTMLResponse)
-def get_manager_dashboard(request: Request, current_user: dict = Depends(get_current_manager)):
-    return templates.TemplateResponse("hr_dashboard.html", {"request": request})
+async def get_manager_dashboard(request: Request, current_user: dict = Depends(get_current_manager)):
+    return get_page("hr_dashboard.html").response(request)
 
 # ==========================
 # Approve / Reject Leave
 # ==========================
 @Man_router.put("/approve_leave/{leave_id}")
-def approve_leave(leave_id: str, current_user: dict = Depends(get_current_manager)):
-    leave = leave_collection.find_one({"_id": ObjectId(leave_id)})
-    if not leave:
-        raise HTTPException(status_code=404, detail="Leave not found")
+async def approve_leave(leave_id: str, force: bool = False, current_user: dict = Depends(get_current_manager)):
+    if not force and ObjectId.is_valid(leave_id):
+        leave = await leave_collection.find_one(
+            {"_id": ObjectId(leave_id), "status": "Pending"},
+            {"employee_id": 1, "employee_dept": 1, "start_date": 1, "end_date": 1, "status": 1},
+        )
+        if leave and isinstance(leave.get("start_date"), datetime) and isinstance(leave.get("end_date"), datetime):
+            # Only already-approved colleagues count against coverage here
+            report = await coverage_report(
+                leave.get("employee_dept", ""), leave["start_date"], leave["end_date"],
+                statuses=["Approved"], candidate=leave,
+            )
+            if report["exceeds"]:
+                raise HTTPException(status_code=409, detail=coverage_conflict_detail(report))
 
-    leave["status"] = "Approved"
-    leave_collection_history.insert_one(leave)
-    leave_collection.delete_one({"_id": ObjectId(leave_id)})
-
-    return {"message": "✅ Leave approved and moved to history"}
+    await decide_leave(leave_id, "Approved", current_user.get("manager_id"))
+    return {"message": "✅ Leave approved"}
 
 @Man_router.put("/reject_leave/{leave_id}")
-def reject_leave(leave_id: str, current_user: dict = Depends(get_current_manager)):
-    leave = leave_collection.find_one({"_id": ObjectId(leave_id)})
-    if not leave:
-        raise HTTPException(status_code=404, detail="Leave not found")
+async def reject_leave(leave_id: str, current_user: dict = Depends(get_current_manager)):
+    await decide_leave(leave_id, "Rejected", current_user.get("manager_id"))
+    return {"message": "❌ Leave rejected"}
+
+@Man_router.put("/decide_leaves")
+async def decide_leaves(data: BulkLeaveDecisionInput, current_user: dict = Depends(get_current_manager)):
+    decisions = [
+        (item.leave_id, "Approved" if item.decision == "approve" else "Rejected")
+        for item in data.decisions
+    ]
+    return await decide_leaves_bulk(decisions, current_user.get("manager_id"), force=data.force)
+
+# ==========================
+# List helpers (filters, projections, keyset pages)
+# ==========================
+HISTORY_PROJECTION = {"title": 1, "employee_name": 1, "start_date": 1, "end_date": 1, "status": 1}
+PENDING_PROJECTION = {"title": 1, "employee_name": 1, "start_date": 1, "end_date": 1, "status": 1, "submitted_at": 1}
+EMPLOYEE_PROJECTION = {"employee_id": 1, "name": 1, "email": 1, "department": 1, "status": 1}
+EMPLOYEE_LEAVE_PROJECTION = {
+    "employee_name": 1, "employee_id": 1, "title": 1, "start_date": 1, "end_date": 1, "status": 1
+}
+LEAVE_SORT = ["start_date", "_id"]
+PENDING_SORT = ["submitted_at", "_id"]
+ID_SORT = ["_id"]
+
+
+def leave_filter(status=None, department=None, employee_id=None, date_from=None, date_to=None) -> dict:
+    query = date_range_filter(date_from, date_to)
+    if status:
+        query["status"] = status
+    if department:
+        query["employee_dept"] = department
+    if employee_id:
+        query["employee_id"] = employee_id
+    return query
+
+
+async def fetch_page(collection, query: dict, projection: dict, sort_fields: list, limit: int, after: str = None):
+    """One keyset page: returns (docs, next_cursor or None)."""
+    cursor = collection.find(
+        merge_filters(query, keyset_filter(sort_fields, after)), projection
+    ).sort(sort_spec(sort_fields)).limit(limit + 1)
+    docs = await cursor.to_list(length=limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1], sort_fields) if len(docs) > limit else None
+    return docs[:limit], next_cursor
+
+
+def page_response(rows: list, next_cursor: str = None, headers: dict = None) -> FastJSONResponse:
+    """Rows encoded once by orjson, with the next keyset cursor as a header."""
+    headers = dict(headers or {})
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return FastJSONResponse(rows, headers=headers)
+
+
+def _as_date(value):
+    # datetime.date serializes as YYYY-MM-DD; no per-row strftime
+    return value.date() if isinstance(value, datetime) else value
+
+
+def employee_leave_row(lv: dict) -> dict:
+    """Row shape shared by /employee_leaves and /export/leaves."""
+    return {
+        "id": lv["_id"],
+        "employee_name": lv.get("employee_name", "Unknown"),
+        "employee_id": lv.get("employee_id", "Unknown"),
+        "leaveTitle": lv.get("title", "Untitled"),
+        "startDate": _as_date(lv.get("start_date")) or "-",
+        "endDate": _as_date(lv.get("end_date")) or "-",
+        "status": lv.get("status", "Pending")
+    }
 
-    leave["status"] = "Rejected"
-    leave_collection_history.insert_one(leave)
-    leave_collection.delete_one({"_id": ObjectId(leave_id)})
 
-    return {"message": "❌ Leave rejected and moved to history"}
+EMPLOYEE_LEAVE_COLUMNS = ["id", "employee_name", "employee_id", "leaveTitle", "startDate", "endDate", "status"]
 
 # ==========================
 # Leave History (Approved + Rejected)
 # ==========================
-@Man_router.get("/leave_history")
-def get_leave_history(current_user: dict = Depends(get_current_manager)):
-    leaves = []
-    for lv in leave_collection_history.find({}):
-        start = lv.get("start_date")
-        end = lv.get("end_date")
-        if isinstance(start, datetime): start = start.strftime("%Y-%m-%d")
-        if isinstance(end, datetime): end = end.strftime("%Y-%m-%d")
-
-        leaves.append({
-            "id": str(lv.get("_id")),
-            "leaveTitle": lv.get("title", "Untitled"),
-            "employee_name": lv.get("employee_name", "Unknown"),
-            "startDate": start or "-",
-            "endDate": end or "-",
-            "status": lv.get("status", "Unknown")
-        })
-    return leaves
+@Man_router.get("/leave_history", response_model=List[LeaveHistoryRow])
+async def get_leave_history(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    status: Optional[str] = None,
+    department: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_manager),
+):
+    if status and status not in LEAVE_DECISIONS:
+        raise HTTPException(status_code=400, detail="status must be Approved or Rejected")
+    # Decided leaves live next to pending ones; served from the status index
+    query = leave_filter(status or {"$in": list(LEAVE_DECISIONS)}, department, employee_id, date_from, date_to)
+    docs, next_cursor = await fetch_page(
+        leave_collection_readonly, query, HISTORY_PROJECTION, LEAVE_SORT, limit, after
+    )
+
+    leaves = [{
+        "id": lv["_id"],
+        "leaveTitle": lv.get("title", "Untitled"),
+        "employee_name": lv.get("employee_name", "Unknown"),
+        "startDate": _as_date(lv.get("start_date")) or "-",
+        "endDate": _as_date(lv.get("end_date")) or "-",
+        "status": lv.get("status", "Unknown")
+    } for lv in docs]
+    return page_response(leaves, next_cursor)
 
 # ==========================
 # Pending Leaves
 # ==========================
-@Man_router.get("/leave_requests")
-def get_pending_leaves(current_user: dict = Depends(get_current_manager)):
-    leaves = []
-    for lv in leave_collection.find({"status": "Pending"}):
-        start = lv.get("start_date")
-        end = lv.get("end_date")
-        if isinstance(start, datetime): start = start.strftime("%Y-%m-%d")
-        if isinstance(end, datetime): end = end.strftime("%Y-%m-%d")
-
-        leaves.append({
-            "_id": str(lv.get("_id")),
-            "leaveTitle": lv.get("title", "Untitled"),
-            "employee_name": lv.get("employee_name", "Unknown"),
-            "startDate": start or "",
-            "endDate": end or "",
-            "status": lv.get("status", "Pending")
-        })
-    return leaves
+@Man_router.get("/leave_requests", response_model=List[PendingLeaveRow])
+async def get_pending_leaves(
+    request: Request,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    department: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_manager),
+):
+    # Polled by the dashboard: answer 304 from the version counter when nothing changed
+    etag = await list_etag(request, GLOBAL_SCOPE)
+    cached = not_modified(request, etag, "leave_requests")
+    if cached is not None:
+        return cached
+
+    query = leave_filter("Pending", department, employee_id, date_from, date_to)
+    # Primary: the list is re-read right after approve/reject and must not show stale rows
+    docs, next_cursor = await fetch_page(leave_collection, query, PENDING_PROJECTION, PENDING_SORT, limit, after)
+
+    leaves = [{
+        "_id": lv["_id"],
+        "leaveTitle": lv.get("title", "Untitled"),
+        "employee_name": lv.get("employee_name", "Unknown"),
+        "startDate": _as_date(lv.get("start_date")) or "",
+        "endDate": _as_date(lv.get("end_date")) or "",
+        "status": lv.get("status", "Pending")
+    } for lv in docs]
+    return page_response(leaves, next_cursor, etag_headers(etag))
 
 # ==========================
 # Employees List
 # ==========================
-@Man_router.get("/employees")
-def get_employees(current_user: dict = Depends(get_current_manager)):
-    employees = []
-    for emp in users_collection.find({"role": "Employee"}):
-        employees.append({
-            "employee_id": emp.get("employee_id", "Unknown"),
-            "name": emp.get("name", "Unknown"),
-            "email": emp.get("email", ""),
-            "department": emp.get("department", ""),
-            "status": emp.get("status", "Active")
-        })
-    return employees
+@Man_router.get("/employees", response_model=List[EmployeeRow])
+async def get_employees(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    department: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_manager),
+):
+    query = {"role": "Employee"}
+    if department:
+        query["department"] = department
+    if employee_id:
+        query["employee_id"] = employee_id
+    docs, next_cursor = await fetch_page(users_collection_readonly, query, EMPLOYEE_PROJECTION, ID_SORT, limit, after)
+
+    employees = [{
+        "employee_id": emp.get("employee_id", "Unknown"),
+        "name": emp.get("name", "Unknown"),
+        "email": emp.get("email", ""),
+        "department": emp.get("department", ""),
+        "status": emp.get("status", "Active")
+    } for emp in docs]
+    return page_response(employees, next_cursor)
 
 # ==========================
 # All Employee Leaves
 # ==========================
-@Man_router.get("/employee_leaves")
-def get_all_employee_leaves(current_user: dict = Depends(get_current_manager)):
-    all_leaves = list(leave_collection.find({})) + list(leave_collection_history.find({}))
-    leaves = []
-
-    for lv in all_leaves:
-        start = lv.get("start_date")
-        end = lv.get("end_date")
-        if isinstance(start, datetime): start = start.strftime("%Y-%m-%d")
-        if isinstance(end, datetime): end = end.strftime("%Y-%m-%d")
-
-        leaves.append({
-            "id": str(lv.get("_id")),
-            "employee_name": lv.get("employee_name", "Unknown"),
-            "employee_id": lv.get("employee_id", "Unknown"),
-            "leaveTitle": lv.get("title", "Untitled"),
-            "startDate": start or "-",
-            "endDate": end or "-",
-            "status": lv.get("status", "Pending")
-        })
-    return leaves
+@Man_router.get("/employee_leaves", response_model=List[EmployeeLeaveRow])
+async def get_all_employee_leaves(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after: Optional[str] = None,
+    status: Optional[str] = None,
+    department: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_manager),
+):
+    query = leave_filter(status, department, employee_id, date_from, date_to)
+    # Primary: the dashboard re-reads this right after approve / reject
+    all_leaves, next_cursor = await fetch_page(
+        leave_collection, query, EMPLOYEE_LEAVE_PROJECTION, LEAVE_SORT, limit, after
+    )
+    return page_response([employee_leave_row(lv) for lv in all_leaves], next_cursor)
+
+# ==========================
+# Employee Leave Balance
+# ==========================
+@Man_router.get("/balance/{employee_id}")
+async def get_employee_balance(
+    employee_id: str, year: Optional[int] = None, current_user: dict = Depends(get_current_manager)
+):
+    return await get_balance(employee_id, year or datetime.now().year)
+
+# ==========================
+# Team Coverage
+# ==========================
+@Man_router.get("/coverage")
+async def get_coverage(
+    department: str,
+    date_from: str,
+    date_to: str,
+    current_user: dict = Depends(get_current_manager),
+):
+    start, end = parse_date(date_from, "date_from"), parse_date(date_to, "date_to")
+    if end < start:
+        raise HTTPException(status_code=400, detail="date_to is before date_from")
+    if (end - start).days > 366:
+        raise HTTPException(status_code=400, detail="Coverage window is limited to one year")
+    return await coverage_report(department, start, end)
+
+# ==========================
+# Team Calendar (day bitmaps)
+# ==========================
+@Man_router.get("/calendar")
+async def get_calendar(
+    request: Request,
+    department: str,
+    month: str,
+    months: int = Query(1, ge=1, le=CALENDAR_MAX_MONTHS),
+    current_user: dict = Depends(get_current_manager),
+):
+    """Per-employee pending/approved bitsets for `months` months from `month` (YYYY-MM)."""
+    try:
+        first = datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="month must be YYYY-MM")
+    if (first.year - 1) * 12 + first.month - 1 + months > 9999 * 12:  # last month 9999-12
+        raise HTTPException(status_code=400, detail="Calendar cannot extend past 9999-12")
+    return compressed_json_response(request, await get_team_calendar(department, first.year, first.month, months))
+
+# ==========================
+# Department Analytics
+# ==========================
+@Man_router.get("/analytics")
+async def get_analytics(
+    year: Optional[int] = None,
+    department: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_manager),
+):
+    return await get_leave_analytics(
+        year, department, parse_date(date_from, "date_from"), parse_date(date_to, "date_to")
+    )
+
+# ==========================
+# Leave Export (streamed)
+# ==========================
+EXPORT_BATCH_SIZE = 500
+
+
+async def _export_rows(query: dict):
+    # Iterate the cursor so only one driver batch is held in memory
+    cursor = leave_collection_readonly.find(query, EMPLOYEE_LEAVE_PROJECTION, batch_size=EXPORT_BATCH_SIZE)
+    async for lv in cursor:
+        yield employee_leave_row(lv)
+
+
+async def _encode_ndjson(rows):
+    chunk = []
+    async for row in rows:
+        chunk.append(dumps(row))
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+async def _encode_csv(rows):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EMPLOYEE_LEAVE_COLUMNS)
+    writer.writeheader()
+    count = 0
+    async for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate(0)
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+async def _gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# ==========================
+# Bulk Employee Import (streamed report)
+# ==========================
+async def _import_rows(request: Request) -> list:
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    try:
+        if content_type in ("text/csv", "application/csv"):
+            return list(csv.DictReader(io.StringIO(body.decode("utf-8-sig"))))
+        payload = json.loads(body or b"[]")
+    except (UnicodeDecodeError, ValueError, csv.Error):
+        raise HTTPException(status_code=400, detail="Body must be a CSV file or a JSON list of employees")
+    if isinstance(payload, dict):
+        payload = payload.get("employees")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Body must be a CSV file or a JSON list of employees")
+    return payload
+
+
+@Man_router.post("/import_employees")
+async def import_employees_endpoint(request: Request, current_user: dict = Depends(get_current_manager)):
+    """CSV (name,email,department,password) or JSON list; streams one NDJSON line per row."""
+    rows = await _import_rows(request)
+    if len(rows) > BULK_IMPORT_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_IMPORT_MAX} employees per import")
+
+    async def report():
+        async for item in import_employees(rows):
+            lines = item if isinstance(item, list) else [item]
+            yield ("\n".join(json.dumps(line, ensure_ascii=False) for line in lines) + "\n").encode()
+
+    return StreamingResponse(report(), media_type="application/x-ndjson")
+
+
+@Man_router.get("/export/leaves")
+async def export_leaves(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    status: Optional[str] = None,
+    department: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    current_user: dict = Depends(get_current_manager),
+):
+    query = leave_filter(status, department, employee_id, date_from, date_to)
+    rows = _export_rows(query)
+
+    if format == "csv":
+        body, media_type, filename = _encode_csv(rows), "text/csv", "leaves.csv"
+    else:
+        body, media_type, filename = _encode_ndjson(rows), "application/x-ndjson", "leaves.ndjson"
+    if gzip:
+        body, media_type, filename = _gzip_stream(body), "application/gzip", filename + ".gz"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 # ==========================
 # Manager Profile
 # ==========================
 @router.get("/me")
-def get_manager_profile(current_user: dict = Depends(get_current_manager)):
+async def get_manager_profile(current_user: dict = Depends(get_current_manager)):
     return {
         "user_id": current_user.get("user_id"),
         "manager_id": current_user.get("manager_id", current_user.get("employee_id")),
@@ -194,3 +488,19 @@ def get_manager_profile(current_user: dict = Depends(get_current_manager)):
         "department": current_user.get("department", ""),
         "role": current_user.get("role", "Manager")
     }
+
+
+# ==========================
+# Live leave updates (SSE)
+# ==========================
+@Man_router.get("/events")
+async def manager_events(request: Request, token: str):
+    # EventSource cannot send headers, so the JWT comes as ?token=
+    user = await principal_from_token(token)
+    if user.get("role") != "Manager":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return StreamingResponse(
+        sse_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,113 @@
+import os
+from datetime import datetime
+from app.config import load_settings
+from app.db.mongodb import leave_collection_readonly
+from app.utils.cache import TTLLRUCache
+
+# ==========================
+# Load environment
+# ==========================
+load_settings()
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "30"))
+ANALYTICS_CACHE_MAX_SIZE = int(os.getenv("ANALYTICS_CACHE_MAX_SIZE", "256"))
+
+# (year, department, date_from, date_to) -> analytics payload
+analytics_cache = TTLLRUCache(ANALYTICS_CACHE_MAX_SIZE, ANALYTICS_CACHE_TTL_SECONDS)
+# Bumped on every invalidation; a pipeline that straddles one must not cache its result
+_cache_generation = 0
+
+
+def invalidate_analytics():
+    """Any leave write can move every count, so drop the whole cache."""
+    global _cache_generation
+    _cache_generation += 1
+    analytics_cache.clear()
+
+
+# ==========================
+# Pipeline
+# ==========================
+def _days():
+    return {"$sum": {"$ifNull": ["$days", 0]}}
+
+
+def analytics_pipeline(match: dict) -> list:
+    dept = {"$ifNull": ["$employee_dept", "-"]}
+    status = {"$ifNull": ["$status", "Pending"]}
+    return [
+        {"$match": {**match, "start_date": {**match.get("start_date", {}), "$type": "date"}}},
+        {"$project": {"_id": 0, "employee_dept": 1, "status": 1, "start_date": 1, "days": 1}},
+        {"$facet": {
+            "by_department": [
+                {"$group": {"_id": dept, "leaves": {"$sum": 1}, "days": _days()}},
+                {"$sort": {"_id": 1}},
+            ],
+            "by_status": [
+                {"$group": {"_id": status, "leaves": {"$sum": 1}, "days": _days()}},
+                {"$sort": {"_id": 1}},
+            ],
+            "by_month": [
+                {"$group": {
+                    "_id": {"$dateToString": {"format": "%Y-%m", "date": "$start_date"}},
+                    "leaves": {"$sum": 1},
+                    "days": _days(),
+                }},
+                {"$sort": {"_id": 1}},
+            ],
+            "by_department_status": [
+                {"$group": {"_id": {"department": dept, "status": status}, "leaves": {"$sum": 1}, "days": _days()}},
+                {"$sort": {"_id.department": 1, "_id.status": 1}},
+            ],
+        }},
+    ]
+
+
+def _rows(groups: list, key_name: str) -> list:
+    return [{key_name: g["_id"], "leaves": g["leaves"], "days": g["days"]} for g in groups]
+
+
+# ==========================
+# Query
+# ==========================
+async def get_leave_analytics(year: int = None, department: str = None, date_from=None, date_to=None) -> dict:
+    cache_key = (year, department, date_from, date_to)
+    cached = analytics_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    match = {}
+    start_range = {}
+    if year:
+        start_range.update({"$gte": datetime(year, 1, 1), "$lt": datetime(year + 1, 1, 1)})
+    if date_from:
+        start_range["$gte"] = max(date_from, start_range.get("$gte", date_from))
+    if date_to:
+        start_range["$lte"] = date_to
+    if start_range:
+        match["start_date"] = start_range
+    if department:
+        match["employee_dept"] = department
+
+    generation = _cache_generation
+    facets = await leave_collection_readonly.aggregate(analytics_pipeline(match)).to_list(length=1)
+    facets = facets[0] if facets else {}
+
+    result = {
+        "filters": {
+            "year": year,
+            "department": department,
+            "date_from": date_from.strftime("%Y-%m-%d") if date_from else None,
+            "date_to": date_to.strftime("%Y-%m-%d") if date_to else None,
+        },
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "by_department": _rows(facets.get("by_department", []), "department"),
+        "by_status": _rows(facets.get("by_status", []), "status"),
+        "by_month": _rows(facets.get("by_month", []), "month"),
+        "by_department_status": [
+            {**g["_id"], "leaves": g["leaves"], "days": g["days"]}
+            for g in facets.get("by_department_status", [])
+        ],
+    }
+    if generation == _cache_generation:
+        analytics_cache.set(cache_key, result)
+    return result
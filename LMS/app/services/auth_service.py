@@ -1,35 +1,42 @@
 import os
+import time
 from datetime import datetime, timedelta
 from uuid import uuid4
-from dotenv import load_dotenv
-from passlib.context import CryptContext
 from jose import jwt
+from pydantic import ValidationError
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from bson import ObjectId
-from app.db.mongodb import users_collection, leave_collection, leave_collection_history
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from app.config import load_settings
+from app.db.mongodb import users_collection, leave_collection
 from app.db.counters import get_next_employee_number, get_next_manager_number
+from app.services.principal_cache import principal_cache, token_cache, invalidate_principal
+from app.services.balance_service import record_transition, record_transitions, DEFAULT_LEAVE_TYPE
+from app.services.analytics_service import invalidate_analytics
+from app.services.calendar_service import record_calendar_change
+from app.services.version_service import bump_versions
+from app.services.conflict_service import (
+    ensure_no_own_overlap, coverage_report, coverage_conflict_detail, MAX_LEAVE_SPAN_DAYS
+)
+from app.utils.business_days import business_days
+from app.services.password_pool import hash_password_async, verify_password_async, hash_passwords_async
+from app.models.schemas import UserCreateInput
 
 # ==========================
 # Load environment
 # ==========================
-load_dotenv()
+load_settings()
 SECRET_KEY = os.getenv("SECRET_KEY", "default_secret")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+BULK_DECISION_MAX = int(os.getenv("BULK_DECISION_MAX", "200"))
+BULK_IMPORT_MAX = int(os.getenv("BULK_IMPORT_MAX", "5000"))
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "200"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
-# ==========================
-# Password utils
-# ==========================
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password[:72])
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
-
 # ==========================
 # JWT utils
 # ==========================
@@ -40,36 +47,57 @@ def create_access_token(data: dict, expires_delta: int = ACCESS_TOKEN_EXPIRE_MIN
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def decode_token(token: str) -> dict:
+    # Signature already verified for this exact token -> only re-check expiry
+    payload = token_cache.get(token)
+    if payload is not None:
+        if payload.get("exp", 0) <= time.time():
+            token_cache.invalidate(token)
+            raise HTTPException(status_code=401, detail="Token expired")
+        return payload
+
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    if "exp" in payload:
+        token_cache.set(token, payload, ttl=payload["exp"] - time.time())
+    return payload
+
 # ==========================
 # Current user
 # ==========================
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await principal_from_token(credentials.credentials)
+
+
+async def principal_from_token(token: str) -> dict:
+    """Principal for a raw JWT (also used where no Authorization header
+    can be sent, e.g. EventSource connections passing ?token=)."""
     payload = decode_token(token)
     user_id = payload.get("user_id")
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return dict(principal)
+
+    user = await users_collection.find_one({"_id": ObjectId(user_id)})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Ensure IDs exist
     if user.get("role") == "Employee" and "employee_id" not in user:
-        user["employee_id"] = str(uuid4())
-        users_collection.update_one({"_id": user["_id"]}, {"$set": {"employee_id": user["employee_id"]}})
+        user["employee_id"] = await get_next_employee_number()
+        await users_collection.update_one({"_id": user["_id"]}, {"$set": {"employee_id": user["employee_id"]}})
     elif user.get("role") == "Manager" and "manager_id" not in user:
-        user["manager_id"] = str(uuid4())
-        users_collection.update_one({"_id": user["_id"]}, {"$set": {"manager_id": user["manager_id"]}})
+        user["manager_id"] = await get_next_manager_number()
+        await users_collection.update_one({"_id": user["_id"]}, {"$set": {"manager_id": user["manager_id"]}})
 
-    return {
+    principal = {
         "user_id": str(user["_id"]),
         "employee_id": user.get("employee_id"),
         "manager_id": user.get("manager_id"),
@@ -78,23 +106,28 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         "department": user["department"],
         "role": user.get("role", "Employee")
     }
+    principal_cache.set(user_id, principal)
+    return dict(principal)
 
 
 # ==========================
 # Create user
 # ==========================
-def create_user(name: str, email: str, department: str, password: str, role: str = "Employee"):
+async def create_user(name: str, email: str, department: str, password: str, role: str = "Employee"):
     # 1️⃣ Check email uniqueness BEFORE insertion
-    if users_collection.find_one({"email": email}):
+    if await users_collection.find_one({"email": email}):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # 2️⃣ Generate Employee or Manager ID
-    user_id_number = str(uuid4())
+    # 2️⃣ Generate Employee or Manager ID (EMP001 / MAN001, leased in blocks)
+    if role == "Employee":
+        user_id_number = await get_next_employee_number()
+    else:
+        user_id_number = await get_next_manager_number()
     user_doc = {
         "name": name,
         "email": email,
         "department": department,
-        "password": hash_password(password),
+        "password": await hash_password_async(password),
         "role": role,
     }
 
@@ -105,7 +138,10 @@ def create_user(name: str, email: str, department: str, password: str, role: str
 
     # 3️⃣ Insert into DB
     try:
-        result = users_collection.insert_one(user_doc)
+        result = await users_collection.insert_one(user_doc)
+    except DuplicateKeyError:
+        # Lost a signup race; the unique email index rejected the second insert
+        raise HTTPException(status_code=400, detail="Email already registered")
     except Exception as e:
         # If insertion fails, nothing is saved
         raise HTTPException(status_code=500, detail="Database insertion failed: " + str(e))
@@ -139,18 +175,27 @@ def create_user(name: str, email: str, department: str, password: str, role: str
 # ==========================
 # Authenticate user
 # ==========================
-def authenticate_user(email: str, password: str):
-    user = users_collection.find_one({"email": email})
-    if not user or not verify_password(password, user["password"]):
+async def authenticate_user(email: str, password: str):
+    user = await users_collection.find_one({"email": email})
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    valid, new_hash = await verify_password_async(password, user["password"])
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    # Transparent rehash when BCRYPT_ROUNDS changed since this hash was made
+    if new_hash:
+        await users_collection.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
 
     # Ensure IDs exist
     if user.get("role") == "Employee" and "employee_id" not in user:
-        user["employee_id"] = str(uuid4())
-        users_collection.update_one({"_id": user["_id"]}, {"$set": {"employee_id": user["employee_id"]}})
+        user["employee_id"] = await get_next_employee_number()
+        await users_collection.update_one({"_id": user["_id"]}, {"$set": {"employee_id": user["employee_id"]}})
+        invalidate_principal(user["_id"])
     elif user.get("role") == "Manager" and "manager_id" not in user:
-        user["manager_id"] = str(uuid4())
-        users_collection.update_one({"_id": user["_id"]}, {"$set": {"manager_id": user["manager_id"]}})
+        user["manager_id"] = await get_next_manager_number()
+        await users_collection.update_one({"_id": user["_id"]}, {"$set": {"manager_id": user["manager_id"]}})
+        invalidate_principal(user["_id"])
 
     user_info = {
         "user_id": str(user["_id"]),
@@ -173,24 +218,292 @@ def authenticate_user(email: str, password: str):
     }
 
 
+# ==========================
+# Bulk employee import
+# ==========================
+async def _import_batch(batch: list, seen_emails: set) -> list:
+    """Create one batch of (row_number, raw_row) employees; returns per-row results."""
+    results = {}
+    valid = []
+    for row_no, raw in batch:
+        try:
+            # model_validate, not **raw: csv.DictReader puts surplus columns under the key None
+            data = UserCreateInput.model_validate(raw)
+        except ValidationError as e:
+            err = e.errors()[0]
+            field = ".".join(str(loc) for loc in err.get("loc", ())) or "row"
+            results[row_no] = {"row": row_no, "email": raw.get("email"), "result": "invalid",
+                               "detail": f"{field}: {err.get('msg')}"}
+            continue
+        email = data.email
+        if email in seen_emails:
+            results[row_no] = {"row": row_no, "email": email, "result": "duplicate", "detail": "Email repeated in import"}
+            continue
+        seen_emails.add(email)
+        valid.append((row_no, data, email))
+
+    # One $in round trip instead of a find_one per row
+    existing = set()
+    if valid:
+        cursor = users_collection.find({"email": {"$in": [email for _, _, email in valid]}}, {"email": 1})
+        existing = {doc["email"] async for doc in cursor}
+    fresh = []
+    for row_no, data, email in valid:
+        if email in existing:
+            results[row_no] = {"row": row_no, "email": email, "result": "duplicate", "detail": "Email already registered"}
+        else:
+            fresh.append((row_no, data, email))
+
+    try:
+        hashes = await hash_passwords_async([data.password for _, data, _ in fresh])
+    except HTTPException as e:
+        # Pool saturated (429) mid-import: report the batch, don't break the stream
+        for row_no, _, email in fresh:
+            results[row_no] = {"row": row_no, "email": email, "result": "error", "detail": e.detail}
+        fresh, hashes = [], []
+    docs = []
+    for (row_no, data, email), hashed in zip(fresh, hashes):
+        docs.append({
+            "name": data.name,
+            "email": email,
+            "department": data.department,
+            "password": hashed,
+            "role": "Employee",
+            "employee_id": await get_next_employee_number(),
+        })
+
+    failed = {}
+    if docs:
+        try:
+            await users_collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                failed[err["index"]] = err
+    for index, ((row_no, _, email), doc) in enumerate(zip(fresh, docs)):
+        err = failed.get(index)
+        if err is None:
+            results[row_no] = {"row": row_no, "email": email, "result": "created", "employee_id": doc["employee_id"]}
+        elif err.get("code") == 11000:
+            # Lost a race with a concurrent signup; the unique email index caught it
+            results[row_no] = {"row": row_no, "email": email, "result": "duplicate", "detail": "Email already registered"}
+        else:
+            results[row_no] = {"row": row_no, "email": email, "result": "error", "detail": err.get("errmsg", "Insert failed")}
+    return [results[row_no] for row_no, _ in batch]
+
+
+async def import_employees(rows: list):
+    """Create employees in batches, yielding each batch's per-row results.
+
+    Emails are checked with one $in query per batch, passwords hashed
+    across the process pool and users written with insert_many
+    (ordered=False). The final item is {"summary": {...}}.
+    """
+    summary = {"requested": len(rows), "created": 0, "duplicate": 0, "invalid": 0, "error": 0}
+    seen_emails = set()
+    numbered = [(i + 1, row if isinstance(row, dict) else {}) for i, row in enumerate(rows)]
+    for start in range(0, len(numbered), BULK_IMPORT_BATCH_SIZE):
+        results = await _import_batch(numbered[start:start + BULK_IMPORT_BATCH_SIZE], seen_emails)
+        for result in results:
+            summary[result["result"]] += 1
+        yield results
+    yield {"summary": summary}
+
+
 # ==========================
 # Submit leave
 # ==========================
-def submit_leave(employee_id, employee_name, employee_email, employee_dept, leaveTitle, startDate, endDate, days, description):
+async def submit_leave(employee_id, employee_name, employee_email, employee_dept, leaveTitle, startDate, endDate, days, description, leave_type=DEFAULT_LEAVE_TYPE):
+    try:
+        start_date = datetime.strptime(startDate, "%Y-%m-%d")
+        end_date = datetime.strptime(endDate, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="End date is before start date")
+    # Overlap / coverage queries only look MAX_LEAVE_SPAN_DAYS back; longer leaves would slip past them
+    if (end_date - start_date).days + 1 > MAX_LEAVE_SPAN_DAYS:
+        raise HTTPException(status_code=400, detail=f"Leave cannot span more than {MAX_LEAVE_SPAN_DAYS} days")
+    # Client-sent `days` is ignored: count working days on the department's calendar
+    days = business_days(start_date, end_date, employee_dept)
+    if days == 0:
+        raise HTTPException(status_code=400, detail="Leave covers no working days")
+    await ensure_no_own_overlap(employee_id, start_date, end_date)
+
     leave_doc = {
         "employee_id": employee_id,
         "employee_name": employee_name,
         "employee_email": employee_email,
         "employee_dept": employee_dept,
         "title": leaveTitle,
-        "start_date": datetime.strptime(startDate, "%Y-%m-%d"),
-        "end_date": datetime.strptime(endDate, "%Y-%m-%d"),
+        "start_date": start_date,
+        "end_date": end_date,
         "days": days,
         "description": description,
+        "leave_type": leave_type or DEFAULT_LEAVE_TYPE,
         "status": "Pending",
         "submitted_at": datetime.now()
     }
 
-    result = leave_collection.insert_one(leave_doc)
+    result = await leave_collection.insert_one(leave_doc)
+    await record_transition(leave_doc, to_status="Pending")
+    invalidate_analytics()
+    record_calendar_change(leave_doc)
+    await bump_versions([employee_id])
     leave_doc["_id"] = str(result.inserted_id)
     return leave_doc
+
+
+# ==========================
+# Approve / Reject leave
+# ==========================
+LEAVE_DECISIONS = ("Approved", "Rejected")
+
+
+async def decide_leave(leave_id: str, status: str, manager_id: str = None):
+    """Atomically move a Pending leave to Approved/Rejected.
+
+    The status == "Pending" guard makes concurrent approve/reject calls
+    safe: exactly one of them matches, the others get a 409.
+    """
+    if status not in LEAVE_DECISIONS:
+        raise HTTPException(status_code=400, detail="Invalid decision")
+    if not ObjectId.is_valid(leave_id):
+        raise HTTPException(status_code=404, detail="Leave not found")
+
+    leave = await leave_collection.find_one_and_update(
+        {"_id": ObjectId(leave_id), "status": "Pending"},
+        {"$set": {"status": status, "decided_at": datetime.now(), "decided_by": manager_id}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if leave is None:
+        current = await leave_collection.find_one({"_id": ObjectId(leave_id)}, {"status": 1})
+        if not current:
+            raise HTTPException(status_code=404, detail="Leave not found")
+        raise HTTPException(status_code=409, detail=f"Leave already {current.get('status', 'decided').lower()}")
+
+    await record_transition(leave, from_status="Pending", to_status=status)
+    invalidate_analytics()
+    record_calendar_change(leave)
+    await bump_versions([leave.get("employee_id")])
+    return leave
+
+
+async def _coverage_conflicts(leave_ids: list) -> dict:
+    """leave_id -> detail for approvals that would break department coverage.
+
+    Runs the approve_leave check per leave, in batch order and per
+    department, counting the batch's earlier accepted approvals as off.
+    """
+    leaves = {
+        str(doc["_id"]): doc
+        async for doc in leave_collection.find(
+            {"_id": {"$in": [ObjectId(i) for i in leave_ids]}, "status": "Pending"},
+            {"employee_id": 1, "employee_dept": 1, "start_date": 1, "end_date": 1, "status": 1},
+        )
+    }
+    conflicts, accepted = {}, {}  # accepted: department -> [leave, ...]
+    for leave_id in leave_ids:
+        leave = leaves.get(leave_id)
+        if leave is None or not isinstance(leave.get("start_date"), datetime) or not isinstance(leave.get("end_date"), datetime):
+            continue  # the bulk write reports it
+        department = leave.get("employee_dept", "")
+        report = await coverage_report(
+            department, leave["start_date"], leave["end_date"], statuses=["Approved"],
+            candidate=leave, include_leaves=False, also_off=accepted.get(department),
+        )
+        if report["exceeds"]:
+            conflicts[leave_id] = coverage_conflict_detail(report)
+        else:
+            accepted.setdefault(department, []).append(leave)
+    return conflicts
+
+
+async def decide_leaves_bulk(decisions: list, manager_id: str = None, force: bool = False) -> dict:
+    """Apply many (leave_id, "Approved"/"Rejected") decisions in one bulk_write.
+
+    Every update carries the same status == "Pending" guard as
+    decide_leave, plus a batch tag so a single follow-up read can tell
+    which ids this call actually moved. Unless `force`, approvals that
+    would break department coverage are skipped as "conflict".
+    """
+    if len(decisions) > BULK_DECISION_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_DECISION_MAX} decisions per batch")
+
+    batch_id = str(uuid4())
+    now = datetime.now()
+    report = [None] * len(decisions)
+    seen = set()
+    ops, op_ids, op_positions = [], [], []
+
+    first = {}  # leave_id -> decision that counts (repeats are reported as duplicates)
+    for leave_id, status in decisions:
+        first.setdefault(leave_id, status)
+    approvals = [i for i, status in first.items() if status == "Approved" and ObjectId.is_valid(i)]
+    coverage = {} if force or not approvals else await _coverage_conflicts(approvals)
+
+    for pos, (leave_id, status) in enumerate(decisions):
+        if leave_id in seen:
+            report[pos] = {"leave_id": leave_id, "result": "duplicate", "detail": "Repeated in batch"}
+            continue
+        seen.add(leave_id)
+        if status not in LEAVE_DECISIONS:
+            report[pos] = {"leave_id": leave_id, "result": "invalid", "detail": "Invalid decision"}
+            continue
+        if not ObjectId.is_valid(leave_id):
+            report[pos] = {"leave_id": leave_id, "result": "not_found", "detail": "Leave not found"}
+            continue
+        if status == "Approved" and leave_id in coverage:
+            report[pos] = {"leave_id": leave_id, "result": "conflict", "detail": coverage[leave_id]}
+            continue
+        ops.append(UpdateOne(
+            {"_id": ObjectId(leave_id), "status": "Pending"},
+            {"$set": {"status": status, "decided_at": now, "decided_by": manager_id, "decision_batch": batch_id}},
+        ))
+        op_ids.append(leave_id)
+        op_positions.append(pos)
+
+    if ops:
+        failed = {}
+        try:
+            await leave_collection.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                failed[op_ids[err["index"]]] = err.get("errmsg", "Write failed")
+
+        current = {
+            str(doc["_id"]): doc
+            async for doc in leave_collection.find(
+                {"_id": {"$in": [ObjectId(i) for i in op_ids]}},
+                {"status": 1, "decision_batch": 1, "employee_id": 1, "employee_name": 1, "employee_dept": 1,
+                 "start_date": 1, "end_date": 1, "days": 1, "leave_type": 1},
+            )
+        }
+        moved = [doc for doc in current.values() if doc.get("decision_batch") == batch_id]
+        await record_transitions(moved)
+        if moved:
+            invalidate_analytics()
+            await bump_versions([doc.get("employee_id") for doc in moved])
+        for doc in moved:
+            record_calendar_change(doc)
+        for leave_id, pos in zip(op_ids, op_positions):
+            doc = current.get(leave_id)
+            if leave_id in failed:
+                report[pos] = {"leave_id": leave_id, "result": "error", "detail": failed[leave_id]}
+            elif doc is None:
+                report[pos] = {"leave_id": leave_id, "result": "not_found", "detail": "Leave not found"}
+            elif doc.get("decision_batch") == batch_id:
+                report[pos] = {"leave_id": leave_id, "result": "updated", "status": doc["status"]}
+            else:
+                report[pos] = {
+                    "leave_id": leave_id,
+                    "result": "conflict",
+                    "detail": f"Leave already {doc.get('status', 'decided').lower()}",
+                }
+
+    updated = sum(1 for r in report if r["result"] == "updated")
+    return {
+        "requested": len(decisions),
+        "updated": updated,
+        "failed": len(decisions) - updated,
+        "results": report,
+    }
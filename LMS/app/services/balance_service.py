@@ -0,0 +1,171 @@
+"""
+Per-employee, per-year leave usage aggregates.
+
+One document per (employee_id, year) in `leave_balances`, keyed by
+"<employee_id>:<year>" so a balance lookup is a single _id point read:
+
+    {"_id": "EMP001:2025", "employee_id": "EMP001", "year": 2025,
+     "pending":  {"total": 2, "by_type": {"General": 2}},
+     "approved": {"total": 5, "by_type": {"Sick": 2, "General": 3}},
+     "rejected": {"total": 0, "by_type": {}}}
+
+submit_leave and the approve/reject transitions keep it current with
+$inc; `python -m app.services.balance_service --rebuild` recomputes it
+from the raw leaves (use after migrations or to repair drift).
+"""
+import sys
+import asyncio
+import argparse
+from datetime import datetime
+from uuid import uuid4
+from pymongo import UpdateOne, ReplaceOne
+from app.db.mongodb import lazy_collection, leave_collection
+
+balance_collection = lazy_collection("leave_balances")
+
+DEFAULT_LEAVE_TYPE = "General"
+STATUS_BUCKETS = {"Pending": "pending", "Approved": "approved", "Rejected": "rejected"}
+
+
+# ==========================
+# Helpers
+# ==========================
+def balance_id(employee_id: str, year: int) -> str:
+    return f"{employee_id}:{year}"
+
+
+def _type_key(leave_type) -> str:
+    # Field names may not contain "." or start with "$"
+    key = str(leave_type or DEFAULT_LEAVE_TYPE).replace(".", "_").lstrip("$")
+    return key or DEFAULT_LEAVE_TYPE
+
+
+def _leave_year(leave: dict):
+    start = leave.get("start_date")
+    return start.year if isinstance(start, datetime) else None
+
+
+def _empty_balance(employee_id: str, year: int) -> dict:
+    doc = {"_id": balance_id(employee_id, year), "employee_id": employee_id, "year": year}
+    for bucket in STATUS_BUCKETS.values():
+        doc[bucket] = {"total": 0, "by_type": {}}
+    return doc
+
+
+def _inc_ops(leave: dict, from_status: str = None, to_status: str = None):
+    """UpdateOne moving this leave's days between status buckets."""
+    year = _leave_year(leave)
+    if year is None or not leave.get("employee_id"):
+        return None
+    days = leave.get("days") or 0
+    type_key = _type_key(leave.get("leave_type"))
+    inc = {}
+    for status, sign in ((from_status, -1), (to_status, 1)):
+        if status in STATUS_BUCKETS:
+            bucket = STATUS_BUCKETS[status]
+            inc[f"{bucket}.total"] = inc.get(f"{bucket}.total", 0) + sign * days
+            inc[f"{bucket}.by_type.{type_key}"] = inc.get(f"{bucket}.by_type.{type_key}", 0) + sign * days
+    if not inc:
+        return None
+    return UpdateOne(
+        {"_id": balance_id(leave["employee_id"], year)},
+        {"$inc": inc, "$setOnInsert": {"employee_id": leave["employee_id"], "year": year}},
+        upsert=True,
+    )
+
+
+# ==========================
+# Incremental updates
+# ==========================
+async def record_transition(leave: dict, from_status: str = None, to_status: str = None):
+    op = _inc_ops(leave, from_status, to_status)
+    if op is not None:
+        await balance_collection.bulk_write([op])
+
+
+async def record_transitions(leaves: list, from_status: str = "Pending"):
+    """Batch form for bulk decisions: each leave moves to its own status."""
+    ops = [op for op in (_inc_ops(lv, from_status, lv.get("status")) for lv in leaves) if op is not None]
+    if ops:
+        await balance_collection.bulk_write(ops, ordered=False)
+
+
+# ==========================
+# Lookup
+# ==========================
+async def get_balance(employee_id: str, year: int) -> dict:
+    doc = await balance_collection.find_one({"_id": balance_id(employee_id, year)}, {"rebuild_id": 0})
+    return doc or _empty_balance(employee_id, year)
+
+
+# ==========================
+# Rebuild from raw leaves
+# ==========================
+REBUILD_PIPELINE = [
+    {"$match": {"start_date": {"$type": "date"}, "employee_id": {"$nin": [None, ""]}}},
+    {"$group": {
+        "_id": {
+            "employee_id": "$employee_id",
+            "year": {"$year": "$start_date"},
+            "status": {"$ifNull": ["$status", "Pending"]},
+            "leave_type": {"$ifNull": ["$leave_type", DEFAULT_LEAVE_TYPE]},
+        },
+        "days": {"$sum": {"$ifNull": ["$days", 0]}},
+    }},
+    {"$sort": {"_id.employee_id": 1, "_id.year": 1}},
+]
+
+
+async def rebuild_balances(batch_size: int = 500) -> int:
+    """Recompute every balance document; returns how many were written.
+
+    Run it in a quiet period: $inc updates landing mid-rebuild on a
+    (employee, year) not yet rewritten are overwritten by the recount.
+    """
+    rebuild_id = str(uuid4())
+    written = 0
+    ops = []
+    current = None
+
+    def flush_current():
+        nonlocal current
+        if current is not None:
+            current["rebuild_id"] = rebuild_id
+            ops.append(ReplaceOne({"_id": current["_id"]}, current, upsert=True))
+            current = None
+
+    async for row in leave_collection.aggregate(REBUILD_PIPELINE, allowDiskUse=True):
+        key = row["_id"]
+        bucket = STATUS_BUCKETS.get(key["status"])
+        if bucket is None:
+            continue
+        doc_id = balance_id(key["employee_id"], key["year"])
+        if current is None or current["_id"] != doc_id:
+            flush_current()
+            current = _empty_balance(key["employee_id"], key["year"])
+        type_key = _type_key(key["leave_type"])
+        current[bucket]["total"] += row["days"]
+        current[bucket]["by_type"][type_key] = current[bucket]["by_type"].get(type_key, 0) + row["days"]
+        if len(ops) >= batch_size:
+            await balance_collection.bulk_write(ops, ordered=False)
+            written += len(ops)
+            ops = []
+    flush_current()
+    if ops:
+        await balance_collection.bulk_write(ops, ordered=False)
+        written += len(ops)
+
+    # Anything not rewritten above has no leaves behind it any more
+    await balance_collection.delete_many({"rebuild_id": {"$ne": rebuild_id}})
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Leave balance aggregates")
+    parser.add_argument("--rebuild", action="store_true", help="recompute leave_balances from leave_applications")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+        sys.exit(0)
+    count = asyncio.run(rebuild_balances())
+    print(f"✅ Rebuilt {count} leave balance document(s)")
@@ -0,0 +1,213 @@
+"""
+Team calendar: who in a department is off, as per-employee day bitmaps.
+
+Each (department, year, month) is a MonthGrid holding parallel arrays
+(employee id, name, pending bits, approved bits) where bit d of a mask
+is day d + 1 of the month. Grids are built from one indexed overlap
+query and cached; submit / approve / reject patch any cached grid the
+leave touches instead of dropping it, and the TTL bounds staleness from
+writes made by other workers.
+
+Responses stitch months into one bitset per employee, sent as base64 of
+the little-endian bytes with trailing zero bytes dropped (bit d of the
+result is startDate + d days), in column arrays indexed by employee row.
+Employees with no leave are omitted.
+"""
+import os
+import base64
+import calendar
+from datetime import datetime, timedelta
+from app.config import load_settings
+from app.db.mongodb import leave_collection
+from app.services.conflict_service import overlap_query
+from app.utils.cache import TTLLRUCache
+
+# ==========================
+# Load environment
+# ==========================
+load_settings()
+CALENDAR_CACHE_TTL_SECONDS = float(os.getenv("CALENDAR_CACHE_TTL_SECONDS", "60"))
+CALENDAR_CACHE_MAX_SIZE = int(os.getenv("CALENDAR_CACHE_MAX_SIZE", "1024"))
+CALENDAR_MAX_MONTHS = 12
+
+CALENDAR_STATUSES = ("Pending", "Approved")
+CALENDAR_PROJECTION = {"employee_id": 1, "employee_name": 1, "start_date": 1, "end_date": 1, "status": 1}
+
+# (department, year, month) -> MonthGrid
+calendar_cache = TTLLRUCache(CALENDAR_CACHE_MAX_SIZE, CALENDAR_CACHE_TTL_SECONDS)
+
+
+def _month_bounds(year: int, month: int):
+    n_days = calendar.monthrange(year, month)[1]
+    first = datetime(year, month, 1)
+    return first, first + timedelta(days=n_days - 1), n_days
+
+
+def month_span(year: int, month: int, months: int) -> list:
+    """[(year, month), ...] for `months` consecutive months."""
+    span = []
+    for i in range(months):
+        y, m = divmod(month - 1 + i, 12)
+        span.append((year + y, m + 1))
+    return span
+
+
+# ==========================
+# Month grid
+# ==========================
+class MonthGrid:
+    def __init__(self, department: str, year: int, month: int):
+        self.department = department
+        self.first, self.last, self.n_days = _month_bounds(year, month)
+        self.index = {}         # employee_id -> row
+        self.employee_ids = []  # row -> employee_id
+        self.names = []         # row -> employee_name
+        self.pending = []       # row -> int bitmask
+        self.approved = []      # row -> int bitmask
+        self.row_leaves = []    # row -> {leave_id, ...}
+        self.leaves = {}        # leave_id -> (row, status, mask)
+
+    def _row(self, employee_id: str, name: str) -> int:
+        row = self.index.get(employee_id)
+        if row is None:
+            row = self.index[employee_id] = len(self.employee_ids)
+            self.employee_ids.append(employee_id)
+            self.names.append(name)
+            self.pending.append(0)
+            self.approved.append(0)
+            self.row_leaves.append(set())
+        elif name:
+            self.names[row] = name
+        return row
+
+    def _mask(self, start: datetime, end: datetime) -> int:
+        s = max((start - self.first).days, 0)
+        e = min((end - self.first).days, self.n_days - 1)
+        return ((1 << (e - s + 1)) - 1) << s if s <= e else 0
+
+    def _refresh(self, row: int):
+        pending = approved = 0
+        for leave_id in self.row_leaves[row]:
+            _, status, mask = self.leaves[leave_id]
+            if status == "Approved":
+                approved |= mask
+            else:
+                pending |= mask
+        self.pending[row], self.approved[row] = pending, approved
+
+    def apply(self, leave: dict):
+        """Add, move or remove one leave's days (idempotent)."""
+        leave_id = str(leave["_id"])
+        old = self.leaves.pop(leave_id, None)
+        if old is not None:
+            self.row_leaves[old[0]].discard(leave_id)
+            self._refresh(old[0])
+
+        start, end = leave.get("start_date"), leave.get("end_date")
+        if leave.get("status") not in CALENDAR_STATUSES:
+            return
+        if not isinstance(start, datetime) or not isinstance(end, datetime):
+            return
+        mask = self._mask(start, end)
+        if not mask:
+            return
+        row = self._row(leave.get("employee_id"), leave.get("employee_name", "Unknown"))
+        self.leaves[leave_id] = (row, leave["status"], mask)
+        self.row_leaves[row].add(leave_id)
+        self._refresh(row)
+
+
+def _leave_months(leave: dict) -> list:
+    start, end = leave.get("start_date"), leave.get("end_date")
+    if not isinstance(start, datetime) or not isinstance(end, datetime) or end < start:
+        return []
+    n_months = (end.year - start.year) * 12 + end.month - start.month + 1
+    return month_span(start.year, start.month, n_months)
+
+
+def build_grids(department: str, months: list, leaves) -> dict:
+    """MonthGrid per (year, month) from leaves overlapping the span."""
+    grids = {(y, m): MonthGrid(department, y, m) for y, m in months}
+    for lv in leaves:
+        for key in _leave_months(lv):
+            grid = grids.get(key)
+            if grid is not None:
+                grid.apply(lv)
+    return grids
+
+
+async def _load_grids(department: str, months: list) -> dict:
+    first, _, _ = _month_bounds(*months[0])
+    _, last, _ = _month_bounds(*months[-1])
+    query = {"employee_dept": department, "status": {"$in": list(CALENDAR_STATUSES)}, **overlap_query(first, last)}
+    leaves = await leave_collection.find(query, CALENDAR_PROJECTION).to_list(length=None)
+    return build_grids(department, months, leaves)
+
+
+# ==========================
+# Incremental updates
+# ==========================
+def record_calendar_change(leave: dict, department: str = None):
+    """Patch cached grids after a submit / approve / reject."""
+    department = department or leave.get("employee_dept")
+    for y, m in _leave_months(leave):
+        grid = calendar_cache.peek((department, y, m))
+        if grid is not None:
+            grid.apply(leave)
+
+
+# ==========================
+# Response
+# ==========================
+def _encode_bits(mask: int) -> str:
+    if not mask:
+        return ""
+    return base64.b64encode(mask.to_bytes((mask.bit_length() + 7) // 8, "little")).decode()
+
+
+def render_calendar(department: str, months: list, grids: dict) -> dict:
+    start, _, _ = _month_bounds(*months[0])
+    combined = {}  # employee_id -> [name, pending, approved]
+    offset = 0
+    for key in months:
+        grid = grids[key]
+        for row, employee_id in enumerate(grid.employee_ids):
+            pending, approved = grid.pending[row], grid.approved[row]
+            if not (pending or approved):
+                continue
+            entry = combined.setdefault(employee_id, [grid.names[row], 0, 0])
+            entry[1] |= pending << offset
+            entry[2] |= approved << offset
+        offset += grid.n_days
+
+    rows = sorted(combined.items(), key=lambda kv: str(kv[0]))
+    # Column arrays, one entry per employee row
+    return {
+        "department": department,
+        "startDate": start.strftime("%Y-%m-%d"),
+        "days": offset,
+        "encoding": "base64 little-endian bitset, bit d = startDate + d days",
+        "employee_ids": [employee_id for employee_id, _ in rows],
+        "names": [entry[0] for _, entry in rows],
+        "pending": [_encode_bits(entry[1]) for _, entry in rows],
+        "approved": [_encode_bits(entry[2]) for _, entry in rows],
+    }
+
+
+async def get_team_calendar(department: str, year: int, month: int, months: int = 1) -> dict:
+    span = month_span(year, month, months)
+    grids, missing = {}, []
+    for y, m in span:
+        grid = calendar_cache.get((department, y, m))
+        if grid is None:
+            missing.append((y, m))
+        else:
+            grids[(y, m)] = grid
+
+    if missing:
+        # One indexed query for the whole missing stretch
+        loaded = await _load_grids(department, span[span.index(missing[0]):span.index(missing[-1]) + 1])
+        for key in missing:
+            grids[key] = loaded[key]
+            calendar_cache.set((department, *key), loaded[key])
+    return render_calendar(department, span, grids)
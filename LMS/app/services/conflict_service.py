@@ -0,0 +1,156 @@
+import os
+from datetime import datetime, timedelta
+from app.config import load_settings
+from fastapi import HTTPException
+from app.db.mongodb import leave_collection, users_collection
+
+# ==========================
+# Load environment
+# ==========================
+load_settings()
+# Longest leave submit_leave accepts; bounds the index range scan on start_date
+MAX_LEAVE_SPAN_DAYS = int(os.getenv("MAX_LEAVE_SPAN_DAYS", "366"))
+# Share of a department that may be off on the same day
+COVERAGE_MAX_OFF_RATIO = float(os.getenv("COVERAGE_MAX_OFF_RATIO", "0.3"))
+
+ACTIVE_STATUSES = ["Pending", "Approved"]
+OVERLAP_PROJECTION = {"employee_id": 1, "employee_name": 1, "title": 1, "start_date": 1, "end_date": 1, "status": 1}
+
+
+# ==========================
+# Indexed interval query
+# ==========================
+def overlap_query(start: datetime, end: datetime) -> dict:
+    """Leaves intersecting [start, end].
+
+    start_date is range-bounded on both sides (end - MAX_LEAVE_SPAN_DAYS
+    .. end) so the employee_start / dept_start indexes scan only nearby
+    keys instead of every leave that started before `end`.
+    """
+    span = timedelta(days=MAX_LEAVE_SPAN_DAYS)
+    lower = start - span if start - datetime.min > span else datetime.min  # year-1 dates
+    return {
+        "start_date": {"$gte": lower, "$lte": end},
+        "end_date": {"$gte": start},
+    }
+
+
+async def find_own_overlaps(employee_id: str, start: datetime, end: datetime, exclude_id=None) -> list:
+    query = {"employee_id": employee_id, "status": {"$in": ACTIVE_STATUSES}, **overlap_query(start, end)}
+    if exclude_id is not None:
+        query["_id"] = {"$ne": exclude_id}
+    return await leave_collection.find(query, OVERLAP_PROJECTION).to_list(length=None)
+
+
+async def ensure_no_own_overlap(employee_id: str, start: datetime, end: datetime):
+    overlaps = await find_own_overlaps(employee_id, start, end)
+    if overlaps:
+        ranges = ", ".join(
+            f"{lv['start_date']:%Y-%m-%d} to {lv['end_date']:%Y-%m-%d} ({lv.get('status', 'Pending')})"
+            for lv in overlaps
+        )
+        raise HTTPException(status_code=409, detail=f"Leave overlaps your existing leave: {ranges}")
+
+
+# ==========================
+# Department coverage
+# ==========================
+def _leave_summary(lv: dict) -> dict:
+    return {
+        "leaveId": str(lv["_id"]),
+        "employee_id": lv.get("employee_id"),
+        "employee_name": lv.get("employee_name", "Unknown"),
+        "leaveTitle": lv.get("title", "Untitled"),
+        "startDate": lv["start_date"].strftime("%Y-%m-%d"),
+        "endDate": lv["end_date"].strftime("%Y-%m-%d"),
+        "status": lv.get("status", "Pending"),
+    }
+
+
+def _off_per_day(leaves: list, start: datetime, end: datetime) -> list:
+    """Distinct employees off on each day of [start, end] (sweep line)."""
+    n_days = (end - start).days + 1
+    by_employee = {}
+    for lv in leaves:
+        s = max((lv["start_date"] - start).days, 0)
+        e = min((lv["end_date"] - start).days, n_days - 1)
+        if s <= e:
+            by_employee.setdefault(lv.get("employee_id"), []).append((s, e))
+
+    diff = [0] * (n_days + 1)
+    for intervals in by_employee.values():
+        # merge one employee's intervals so they count once per day
+        intervals.sort()
+        cur_s, cur_e = intervals[0]
+        for s, e in intervals[1:]:
+            if s <= cur_e + 1:
+                cur_e = max(cur_e, e)
+            else:
+                diff[cur_s] += 1
+                diff[cur_e + 1] -= 1
+                cur_s, cur_e = s, e
+        diff[cur_s] += 1
+        diff[cur_e + 1] -= 1
+
+    off, running = [], 0
+    for i in range(n_days):
+        running += diff[i]
+        off.append(running)
+    return off
+
+
+async def coverage_report(
+    department: str,
+    start: datetime,
+    end: datetime,
+    statuses: list = None,
+    candidate: dict = None,
+    include_leaves: bool = True,
+    also_off: list = None,
+) -> dict:
+    """Who in `department` is off during [start, end].
+
+    `candidate` (a leave being submitted/approved) is counted on top of
+    the stored leaves, so `exceeds` answers "would this push us over".
+    `also_off` adds leaves not stored as such yet (earlier approvals in
+    the same bulk decision).
+    """
+    statuses = statuses or ACTIVE_STATUSES
+    query = {"employee_dept": department, "status": {"$in": statuses}, **overlap_query(start, end)}
+    leaves = await leave_collection.find(query, OVERLAP_PROJECTION).to_list(length=None)
+    leaves = [lv for lv in leaves if isinstance(lv.get("start_date"), datetime) and isinstance(lv.get("end_date"), datetime)]
+    extra = list(also_off or []) + ([candidate] if candidate is not None else [])
+    if extra:
+        extra_ids = {lv.get("_id") for lv in extra}
+        leaves = [lv for lv in leaves if lv["_id"] not in extra_ids] + extra
+
+    headcount = await users_collection.count_documents({"role": "Employee", "department": department})
+    limit = max(1, int(headcount * COVERAGE_MAX_OFF_RATIO))
+    off = _off_per_day(leaves, start, end)
+    peak = max(off) if off else 0
+
+    report = {
+        "department": department,
+        "startDate": start.strftime("%Y-%m-%d"),
+        "endDate": end.strftime("%Y-%m-%d"),
+        "headcount": headcount,
+        "max_off": limit,
+        "peak_off": peak,
+        "exceeds": peak > limit,
+        "days": [
+            {"date": (start + timedelta(days=i)).strftime("%Y-%m-%d"), "off": count}
+            for i, count in enumerate(off)
+        ],
+    }
+    if include_leaves:
+        report["leaves"] = [_leave_summary(lv) for lv in leaves]
+    return report
+
+
+def coverage_conflict_detail(report: dict) -> str:
+    peak_days = [d["date"] for d in report["days"] if d["off"] == report["peak_off"]]
+    return (
+        f"Approving would put {report['peak_off']} of {report['headcount']} {report['department']} "
+        f"employees off on {', '.join(peak_days[:5])} (limit {report['max_off']}); "
+        "retry with force=true to approve anyway"
+    )
@@ -0,0 +1,230 @@
+"""
+Leave events pushed to dashboards over Server-Sent Events.
+
+One watcher per process turns leave_applications changes into
+leave_created / leave_approved / leave_rejected events and fans them out
+through an in-process hub. Each SSE connection owns a bounded queue;
+a client too slow to drain it loses its oldest events (the dashboard
+re-fetches on reconnect anyway).
+
+The watcher uses a change stream when MongoDB is a replica set and falls
+back to polling submitted_at / decided_at on standalone servers. Those
+timestamps are taken before the write commits, so each poll re-reads an
+overlap window and skips events it already published.
+"""
+import os
+import json
+import asyncio
+from datetime import datetime, timedelta
+from pymongo.errors import OperationFailure, PyMongoError
+from app.config import load_settings
+from app.db.mongodb import leave_collection
+from app.utils.logger import logger
+
+load_settings()
+EVENTS_ENABLED = os.getenv("EVENTS_ENABLED", "true").lower() in ("1", "true", "yes")
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "2"))
+# submitted_at / decided_at are stamped before the write lands; polls re-read this far back
+EVENTS_POLL_OVERLAP_SECONDS = float(os.getenv("EVENTS_POLL_OVERLAP_SECONDS", "30"))
+EVENTS_KEEPALIVE_SECONDS = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+EVENTS_MODE = os.getenv("EVENTS_MODE", "auto").lower()  # auto | changestream | poll
+
+EVENT_PROJECTION = {
+    "employee_id": 1, "employee_name": 1, "employee_dept": 1, "title": 1,
+    "start_date": 1, "end_date": 1, "days": 1, "status": 1, "submitted_at": 1, "decided_at": 1,
+}
+EVENT_TYPES = {"Pending": "leave_created", "Approved": "leave_approved", "Rejected": "leave_rejected"}
+
+
+def _fmt(value):
+    return value.strftime("%Y-%m-%d") if isinstance(value, datetime) else value
+
+
+def leave_event(lv: dict):
+    event_type = EVENT_TYPES.get(lv.get("status", "Pending"))
+    if event_type is None:
+        return None
+    return {
+        "type": event_type,
+        "leave": {
+            "id": str(lv["_id"]),
+            "employee_id": lv.get("employee_id"),
+            "employee_name": lv.get("employee_name", "Unknown"),
+            "employee_dept": lv.get("employee_dept"),
+            "leaveTitle": lv.get("title", "Untitled"),
+            "startDate": _fmt(lv.get("start_date")),
+            "endDate": _fmt(lv.get("end_date")),
+            "days": lv.get("days"),
+            "status": lv.get("status", "Pending"),
+        },
+    }
+
+
+# ==========================
+# Fan-out hub
+# ==========================
+class Subscription:
+    def __init__(self, employee_id: str = None):
+        self.employee_id = employee_id  # None -> manager, sees every event
+        self.queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        self.dropped = 0
+
+    def wants(self, event: dict) -> bool:
+        return self.employee_id is None or event["leave"]["employee_id"] == self.employee_id
+
+    def offer(self, event: dict):
+        if self.queue.full():
+            # Drop the oldest so the newest state always gets through
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class EventHub:
+    def __init__(self):
+        self.subscribers = set()
+        self.published = 0
+        self.source = None
+
+    def subscribe(self, employee_id: str = None) -> Subscription:
+        sub = Subscription(employee_id)
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        self.subscribers.discard(sub)
+
+    def publish(self, event: dict):
+        self.published += 1
+        for sub in list(self.subscribers):
+            if sub.wants(event):
+                sub.offer(event)
+
+    def stats(self) -> dict:
+        return {
+            "source": self.source,
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "dropped": sum(sub.dropped for sub in self.subscribers),
+        }
+
+
+hub = EventHub()
+
+
+# ==========================
+# Watchers
+# ==========================
+CHANGE_PIPELINE = [{"$match": {"$or": [
+    {"operationType": "insert"},
+    {"operationType": "update", "updateDescription.updatedFields.status": {"$exists": True}},
+]}}]
+
+
+async def _watch_change_stream():
+    resume_token = None
+    while True:
+        try:
+            async with leave_collection.watch(
+                CHANGE_PIPELINE, full_document="updateLookup", resume_after=resume_token
+            ) as stream:
+                hub.source = "changestream"
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    doc = change.get("fullDocument")
+                    event = leave_event(doc) if doc else None
+                    if event:
+                        hub.publish(event)
+        except OperationFailure:
+            raise  # not a replica set (or no permission): caller falls back to polling
+        except PyMongoError as e:
+            logger.warning("Leave change stream interrupted (%s); resuming", e)
+            await asyncio.sleep(1)
+
+
+async def _poll():
+    """Publish leaves stamped after the newest seen, minus an overlap window.
+
+    A write that commits later than a poll that already passed its
+    timestamp is still inside the window on the next poll; (_id, status)
+    pairs already published are skipped.
+    """
+    hub.source = "poll"
+    started = since = datetime.now()
+    overlap = timedelta(seconds=EVENTS_POLL_OVERLAP_SECONDS)
+    published = {}  # (_id, status) -> submitted_at / decided_at
+    while True:
+        await asyncio.sleep(EVENTS_POLL_INTERVAL)
+        cutoff = max(started, since - overlap)
+        try:
+            query = {"$or": [{"submitted_at": {"$gt": cutoff}}, {"decided_at": {"$gt": cutoff}}]}
+            docs = await leave_collection.find(query, EVENT_PROJECTION).to_list(length=None)
+        except PyMongoError as e:
+            logger.warning("Leave event poll failed: %s", e)
+            continue
+
+        def changed_at(d):
+            return max(d.get("decided_at") or cutoff, d.get("submitted_at") or cutoff)
+
+        for doc in sorted(docs, key=changed_at):
+            since = max(since, changed_at(doc))
+            key = (doc["_id"], doc.get("status"))
+            if key in published:
+                continue
+            published[key] = changed_at(doc)
+            event = leave_event(doc)
+            if event:
+                hub.publish(event)
+        published = {key: at for key, at in published.items() if at > since - overlap}
+
+
+async def watch_leaves():
+    """Run forever: change stream if available, polling otherwise."""
+    if EVENTS_MODE != "poll":
+        try:
+            await _watch_change_stream()
+        except OperationFailure as e:
+            if EVENTS_MODE == "changestream":
+                raise
+            logger.info("Change streams unavailable (%s); polling every %ss", e, EVENTS_POLL_INTERVAL)
+    await _poll()
+
+
+_watcher = None
+
+
+def start_event_watcher():
+    global _watcher
+    if EVENTS_ENABLED and _watcher is None:
+        _watcher = asyncio.create_task(watch_leaves())
+
+
+async def stop_event_watcher():
+    global _watcher
+    if _watcher is not None:
+        _watcher.cancel()
+        try:
+            await _watcher
+        except (asyncio.CancelledError, Exception):
+            pass
+        _watcher = None
+
+
+# ==========================
+# SSE stream
+# ==========================
+async def sse_stream(request, employee_id: str = None):
+    """text/event-stream body for one dashboard connection."""
+    sub = hub.subscribe(employee_id)
+    try:
+        yield b"retry: 3000\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n".encode()
+    finally:
+        hub.unsubscribe(sub)
@@ -0,0 +1,126 @@
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+from fastapi import HTTPException
+from app.config import load_settings
+from app.utils.metrics import METRICS_ENABLED, password_hash_seconds
+
+# ==========================
+# Load environment
+# ==========================
+load_settings()
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", "0")) or os.cpu_count() or 1
+PASSWORD_POOL_MAX_QUEUE = int(os.getenv("PASSWORD_POOL_MAX_QUEUE", str(PASSWORD_POOL_WORKERS * 4)))
+PASSWORD_POOL_RETRY_AFTER = os.getenv("PASSWORD_POOL_RETRY_AFTER", "1")
+PASSWORD_POOL_START_METHOD = os.getenv("PASSWORD_POOL_START_METHOD", "spawn")
+
+# Hashes made with a different cost are flagged by needs_update()
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+# ==========================
+# Password utils (run inside the worker processes)
+# ==========================
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password[:72])
+
+def hash_passwords(passwords: list) -> list:
+    return [hash_password(p) for p in passwords]
+
+def verify_password(plain: str, hashed: str) -> bool:
+    return pwd_context.verify(plain, hashed)
+
+def verify_and_rehash(plain: str, hashed: str):
+    """Return (valid, new_hash); new_hash is set only when the stored
+    hash was made with a different bcrypt cost than BCRYPT_ROUNDS."""
+    if not pwd_context.verify(plain, hashed):
+        return False, None
+    if pwd_context.needs_update(hashed):
+        return True, hash_password(plain)
+    return True, None
+
+
+# ==========================
+# Process pool with backpressure
+# ==========================
+_executor = None
+_in_flight = 0
+_rejected = 0
+_completed = 0
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_POOL_WORKERS,
+            mp_context=multiprocessing.get_context(PASSWORD_POOL_START_METHOD),
+        )
+    return _executor
+
+
+async def _submit(fn, *args):
+    started = time.perf_counter() if METRICS_ENABLED else None
+    global _in_flight, _rejected, _completed
+    # Workers busy + queue full -> shed load instead of stalling every request
+    if _in_flight >= PASSWORD_POOL_WORKERS + PASSWORD_POOL_MAX_QUEUE:
+        _rejected += 1
+        raise HTTPException(
+            status_code=429,
+            detail="Too many authentication requests, please retry shortly",
+            headers={"Retry-After": PASSWORD_POOL_RETRY_AFTER},
+        )
+    _in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _in_flight -= 1
+        _completed += 1
+        if started is not None:
+            password_hash_seconds.observe(time.perf_counter() - started, fn.__name__)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _submit(hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str):
+    return await _submit(verify_and_rehash, plain, hashed)
+
+
+async def hash_passwords_async(passwords: list) -> list:
+    """Hash a batch across the pool, one job per worker.
+
+    Leaves one worker free (when there are several) so interactive
+    logins are not stuck behind a bulk import.
+    """
+    if not passwords:
+        return []
+    jobs = max(1, min(PASSWORD_POOL_WORKERS - 1, len(passwords)))
+    size = -(-len(passwords) // jobs)
+    chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    results = await asyncio.gather(*[_submit(hash_passwords, chunk) for chunk in chunks])
+    return [hashed for chunk in results for hashed in chunk]
+
+
+def shutdown_password_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def password_pool_stats() -> dict:
+    return {
+        "workers": PASSWORD_POOL_WORKERS,
+        "max_queue": PASSWORD_POOL_MAX_QUEUE,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "in_flight": _in_flight,
+        "completed": _completed,
+        "rejected": _rejected,
+    }
@@ -0,0 +1,42 @@
+import os
+from app.config import load_settings
+from app.utils.cache import TTLLRUCache
+
+# ==========================
+# Load environment
+# ==========================
+load_settings()
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+TOKEN_CACHE_ENABLED = os.getenv("TOKEN_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+
+
+# ==========================
+# Shared caches
+# ==========================
+# user_id -> principal dict returned by get_current_user
+principal_cache = TTLLRUCache(PRINCIPAL_CACHE_MAX_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+
+# raw JWT -> verified payload (skips signature checks for repeat tokens)
+token_cache = TTLLRUCache(TOKEN_CACHE_MAX_SIZE if TOKEN_CACHE_ENABLED else 0, PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+# ==========================
+# Invalidation hooks
+# ==========================
+def invalidate_principal(user_id):
+    """Call whenever a user document is updated or deleted."""
+    principal_cache.invalidate(str(user_id))
+
+
+def clear_principals():
+    principal_cache.clear()
+    token_cache.clear()
+
+
+def cache_stats() -> dict:
+    return {
+        "principal": principal_cache.stats(),
+        "token": {**token_cache.stats(), "enabled": TOKEN_CACHE_ENABLED},
+    }
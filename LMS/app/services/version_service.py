@@ -0,0 +1,109 @@
+"""
+Change counters behind the weak ETags on polled leave lists.
+
+leave_versions holds one document per scope, {"_id": "global"} and
+{"_id": "employee:<employee_id>"}, each {"v": <int>, "epoch": <uuid>},
+plus {"_id": "epoch", "epoch": <uuid>} shared by every tag. Every leave
+write bumps the global scope and the owner's scope after the write
+lands. A poll reads its scope and the shared epoch (one _id lookup,
+shared by all workers) before touching leave_applications. If
+If-None-Match already names that version it answers 304, otherwise it
+serves the list under the new tag.
+
+A scope's epoch is random and set when its document is created, on the
+first bump or the first poll, so two scopes never share a tag. The tag
+also names the scope. Maintenance scripts that rewrite leaves directly
+call reset_leave_versions(), which replaces the shared epoch and so
+retires every tag clients already hold.
+"""
+import zlib
+from uuid import uuid4
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from fastapi import Request, Response
+from app.db.mongodb import lazy_collection
+from app.utils.metrics import register, Counter
+
+versions_collection = lazy_collection("leave_versions")
+GLOBAL_SCOPE = "global"
+EPOCH_ID = "epoch"
+
+etag_requests = register(Counter(
+    "lms_etag_requests_total", "Conditional GETs on polled lists by result", ("endpoint", "result")))
+_stats = {}  # endpoint -> {"hits": n, "misses": n}
+
+
+def employee_scope(employee_id: str) -> str:
+    return f"employee:{employee_id}"
+
+
+def _bump(scope: str) -> UpdateOne:
+    return UpdateOne({"_id": scope}, {"$inc": {"v": 1}, "$setOnInsert": {"epoch": uuid4().hex}}, upsert=True)
+
+
+async def bump_versions(employee_ids) -> None:
+    """Call after a leave write: global scope plus each affected employee."""
+    ops = [_bump(GLOBAL_SCOPE)] + [_bump(employee_scope(e)) for e in sorted(set(employee_ids)) if e]
+    await versions_collection.bulk_write(ops, ordered=False)
+
+
+def reset_leave_versions(db) -> None:
+    """Sync helper for scripts that modify leaves outside the API: new shared epoch."""
+    db["leave_versions"].update_one({"_id": EPOCH_ID}, {"$set": {"epoch": uuid4().hex}}, upsert=True)
+
+
+async def _ensure(doc_id: str) -> dict:
+    """Create a missing scope / epoch document with a fresh random epoch."""
+    fields = {"epoch": uuid4().hex} if doc_id == EPOCH_ID else {"v": 0, "epoch": uuid4().hex}
+    try:
+        return await versions_collection.find_one_and_update(
+            {"_id": doc_id}, {"$setOnInsert": fields}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:  # concurrent first poll created it
+        return await versions_collection.find_one({"_id": doc_id})
+
+
+# ==========================
+# Conditional GET
+# ==========================
+async def list_etag(request: Request, scope: str) -> str:
+    """Weak ETag for `scope`'s current version, the shared epoch and this URL's query string."""
+    docs = {
+        doc["_id"]: doc
+        async for doc in versions_collection.find({"_id": {"$in": [EPOCH_ID, scope]}})
+    }
+    for doc_id in (EPOCH_ID, scope):
+        if doc_id not in docs:
+            docs[doc_id] = await _ensure(doc_id)
+    shared, doc = docs[EPOCH_ID], docs[scope]
+    variant = zlib.crc32(str(request.query_params).encode())
+    return f'W/"{scope}-{shared["epoch"]}-{doc["epoch"]}-{doc.get("v", 0)}-{variant:08x}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: W/"x" and "x" are the same tag
+    bare = etag[2:]
+    return "*" in tags or any(tag == etag or tag == bare or tag[2:] == bare for tag in tags)
+
+
+def not_modified(request: Request, etag: str, endpoint: str):
+    """304 response when the client's cached copy is current, else None."""
+    stats = _stats.setdefault(endpoint, {"hits": 0, "misses": 0})
+    if _matches(request.headers.get("if-none-match", ""), etag):
+        stats["hits"] += 1
+        etag_requests.inc(endpoint, "not_modified")
+        return Response(status_code=304, headers=etag_headers(etag))
+    stats["misses"] += 1
+    etag_requests.inc(endpoint, "full")
+    return None
+
+
+def etag_headers(etag: str) -> dict:
+    # private: per-user lists; no-cache: browsers revalidate every poll;
+    # Vary: a shared browser must not reuse one user's copy for another
+    return {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+
+def etag_stats() -> dict:
+    return {endpoint: dict(stats) for endpoint, stats in _stats.items()}
@@ -0,0 +1,142 @@
+# utils/business_days.py
+"""
+Working-day arithmetic against per-department holiday calendars.
+
+Calendars come from the JSON file named by HOLIDAY_CALENDAR_FILE
+(default: holidays.json in the working directory); without it every
+department uses a Saturday/Sunday weekend and no holidays.
+
+    {
+      "calendars": {
+        "default": {"weekend": ["sat", "sun"], "holidays": ["2025-01-01", "2025-12-25"]},
+        "gulf":    {"weekend": ["fri", "sat"], "holidays": ["2025-03-30"]}
+      },
+      "departments": {"Operations": "gulf"}
+    }
+
+Each calendar keeps a per-year prefix array (prefix[i] = working days in
+the first i days of the year), so any range costs one subtraction per
+year it spans; range results are memoized in an LRU cache on top.
+"""
+import os
+import json
+from calendar import isleap
+from pathlib import Path
+from functools import lru_cache
+from datetime import date, datetime, timedelta
+from app.config import load_settings
+from app.utils.logger import logger
+
+load_settings()
+HOLIDAY_CALENDAR_FILE = os.getenv("HOLIDAY_CALENDAR_FILE", "holidays.json")
+BUSINESS_DAYS_CACHE_SIZE = int(os.getenv("BUSINESS_DAYS_CACHE_SIZE", "65536"))
+
+DEFAULT_CALENDAR = "default"
+DEFAULT_WEEKEND = (5, 6)
+WEEKDAY_NAMES = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+def _weekday(value) -> int:
+    if isinstance(value, int):
+        return value
+    return WEEKDAY_NAMES[str(value).strip().lower()[:3]]
+
+
+# ==========================
+# Calendar
+# ==========================
+class HolidayCalendar:
+    def __init__(self, name: str, weekend=DEFAULT_WEEKEND, holidays=()):
+        self.name = name
+        self.weekend = frozenset(_weekday(d) for d in weekend)
+        self.holidays = frozenset(_as_date(d) for d in holidays)
+        self._prefix = {}
+
+    def is_business_day(self, day) -> bool:
+        day = _as_date(day)
+        return day.weekday() not in self.weekend and day not in self.holidays
+
+    def _year_prefix(self, year: int) -> list:
+        prefix = self._prefix.get(year)
+        if prefix is None:
+            first = date(year, 1, 1)
+            n_days = 366 if isleap(year) else 365  # no date(year + 1, ...): year 9999 is valid
+            prefix = [0] * (n_days + 1)
+            for i in range(n_days):
+                prefix[i + 1] = prefix[i] + self.is_business_day(first + timedelta(days=i))
+            self._prefix[year] = prefix
+        return prefix
+
+    def count(self, start: date, end: date) -> int:
+        """Working days in [start, end], inclusive."""
+        if end < start:
+            return 0
+        total = 0
+        for year in range(start.year, end.year + 1):
+            prefix = self._year_prefix(year)
+            lo = (max(start, date(year, 1, 1)) - date(year, 1, 1)).days
+            hi = (min(end, date(year, 12, 31)) - date(year, 1, 1)).days
+            total += prefix[hi + 1] - prefix[lo]
+        return total
+
+
+# ==========================
+# Registry
+# ==========================
+_calendars = {}
+_departments = {}
+
+
+def load_calendars(path: str = HOLIDAY_CALENDAR_FILE):
+    """(Re)load calendars from `path`; a missing file leaves only the default."""
+    calendars = {DEFAULT_CALENDAR: HolidayCalendar(DEFAULT_CALENDAR)}
+    departments = {}
+    config_path = Path(path)
+    if config_path.is_file():
+        config = json.loads(config_path.read_text(encoding="utf-8"))
+        for name, spec in config.get("calendars", {}).items():
+            calendars[name] = HolidayCalendar(
+                name, spec.get("weekend", DEFAULT_WEEKEND), spec.get("holidays", ())
+            )
+        for department, name in config.get("departments", {}).items():
+            if name not in calendars:
+                logger.warning(f"Department {department!r} refers to unknown holiday calendar {name!r}")
+                continue
+            departments[department] = name
+        logger.info(f"Loaded {len(calendars)} holiday calendar(s) from {config_path}")
+
+    _calendars.clear()
+    _calendars.update(calendars)
+    _departments.clear()
+    _departments.update(departments)
+    _count_cached.cache_clear()
+
+
+def calendar_for(department: str = None) -> HolidayCalendar:
+    if not _calendars:
+        load_calendars()
+    return _calendars[_departments.get(department, DEFAULT_CALENDAR)]
+
+
+@lru_cache(maxsize=BUSINESS_DAYS_CACHE_SIZE)
+def _count_cached(calendar_name: str, start: date, end: date) -> int:
+    return _calendars[calendar_name].count(start, end)
+
+
+def business_days(start, end, department: str = None) -> int:
+    """Working days from start to end (inclusive) on `department`'s calendar."""
+    calendar = calendar_for(department)
+    return _count_cached(calendar.name, _as_date(start), _as_date(end))
+
+
+def business_days_cache_stats() -> dict:
+    info = _count_cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
@@ -1,27 +1,169 @@
 # utils/logger.py
+"""
+"LMS" logger with non-blocking output.
+
+Log calls only enqueue the record (bounded queue, drop-and-count when
+full); a QueueListener thread does the console/rotating-file I/O.
+Records carry the current request's correlation id, set by
+RequestIdMiddleware from X-Request-ID (or generated). Call
+stop_logging() on shutdown to flush whatever is still queued.
+"""
+import os
+import json
+import time
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from uuid import uuid4
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from pathlib import Path
 
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOG_DIR / "LMS.log"
 
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # json | text
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_REQUESTS = os.getenv("LOG_REQUESTS", "false").lower() in ("1", "true", "yes")
+REQUEST_ID_HEADER = "X-Request-ID"
+
+request_id_var = ContextVar("request_id", default="-")
+
+
+# ==========================
+# Formatting
+# ==========================
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key in ("method", "path", "status", "duration_ms"):
+            if hasattr(record, key):
+                entry[key] = getattr(record, key)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+TEXT_FORMATTER = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s")
+
+
+# ==========================
+# Queue handler (request side)
+# ==========================
+class DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: a full queue drops the record and counts it."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve message/traceback here; the listener formats later in another thread
+        record.request_id = request_id_var.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# ==========================
+# Logger setup
+# ==========================
 logger = logging.getLogger("LMS")
-logger.setLevel(logging.INFO)
+logger.setLevel(LOG_LEVEL)
+logger.propagate = False
+
+_formatter = JsonFormatter() if LOG_FORMAT == "json" else TEXT_FORMATTER
 
 # Console handler
 ch = logging.StreamHandler()
-ch.setLevel(logging.INFO)
-ch_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-ch.setFormatter(ch_formatter)
+ch.setFormatter(_formatter)
 
 # Rotating file handler (5 MB per file, keep 3 backups)
 fh = RotatingFileHandler(LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=3)
-fh.setLevel(logging.INFO)
-fh.setFormatter(ch_formatter)
+fh.setFormatter(_formatter)
+
+log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+queue_handler = DroppingQueueHandler(log_queue)
+listener = QueueListener(log_queue, ch, fh, respect_handler_level=True)
+
+_listening = False
 
 # Avoid duplicate handlers on reload
 if not logger.handlers:
-    logger.addHandler(ch)
-    logger.addHandler(fh)
+    logger.addHandler(queue_handler)
+    listener.start()
+    _listening = True
+
+
+def stop_logging():
+    """Drain the queue and stop the writer thread (idempotent)."""
+    global _listening
+    if _listening:
+        listener.stop()
+        ch.flush()
+        fh.flush()
+        _listening = False
+
+
+atexit.register(stop_logging)
+
+
+def log_stats() -> dict:
+    return {"queued": log_queue.qsize(), "max_queue": LOG_QUEUE_SIZE, "dropped": queue_handler.dropped}
+
+
+# ==========================
+# Correlation ids (ASGI)
+# ==========================
+class RequestIdMiddleware:
+    """Tag each request (and its log records) with X-Request-ID."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        header = REQUEST_ID_HEADER.lower().encode()
+        incoming = next((v for k, v in scope["headers"] if k == header), b"").decode("latin-1")[:128]
+        request_id = incoming or uuid4().hex
+        token = request_id_var.set(request_id)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(header, request_id.encode("latin-1"))]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if LOG_REQUESTS:
+                logger.info("request", extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status["code"],
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                })
+            request_id_var.reset(token)
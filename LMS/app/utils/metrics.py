@@ -0,0 +1,221 @@
+# utils/metrics.py
+"""
+In-process metrics rendered in the Prometheus text format at /metrics.
+
+- MetricsMiddleware: per-route latency histogram and request count by
+  status (labelled by route template, not raw path), plus in-flight gauge.
+- MongoCommandMetrics: pymongo CommandListener recording per-collection,
+  per-command durations and documents returned.
+
+With METRICS_ENABLED=false the middleware and listener are never
+installed, so requests and Mongo commands pay nothing.
+"""
+import os
+import time
+from bisect import bisect_left
+from threading import Lock
+from pymongo import monitoring
+from app.config import load_settings
+
+load_settings()
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ==========================
+# Metric types
+# ==========================
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help_text, labels
+        self._values = {}
+        self._lock = Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_label_str(self.labels, key)} {value}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, labels
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _label_str(self.labels + ("le",), key + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_str(self.labels + ('le',), key + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_label_str(self.labels, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_label_str(self.labels, key)} {series[-1]}")
+        return lines
+
+
+# ==========================
+# Registry
+# ==========================
+_registry = []
+_collectors = []  # callables sampled at scrape time (pool/cache gauges)
+
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def register_collector(fn):
+    """fn() -> list of (name, kind, help, value) sampled on every scrape."""
+    _collectors.append(fn)
+    return fn
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    for collector in _collectors:
+        for name, kind, help_text, value in collector():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+http_request_seconds = register(Histogram(
+    "lms_http_request_duration_seconds", "Request latency by route", ("method", "route")))
+http_requests_total = register(Counter(
+    "lms_http_requests_total", "Requests by route and status", ("method", "route", "status")))
+http_in_flight = register(Gauge(
+    "lms_http_requests_in_flight", "Requests currently being served", ("method",)))
+mongo_command_seconds = register(Histogram(
+    "lms_mongo_command_duration_seconds", "MongoDB command latency", ("collection", "command")))
+mongo_command_failures = register(Counter(
+    "lms_mongo_command_failures_total", "MongoDB commands that failed", ("collection", "command")))
+mongo_documents_returned = register(Counter(
+    "lms_mongo_documents_returned_total", "Documents returned by find/aggregate/getMore", ("collection", "command")))
+password_hash_seconds = register(Histogram(
+    "lms_password_hash_duration_seconds", "bcrypt hash/verify time including pool queueing", ("operation",)))
+
+
+# ==========================
+# HTTP middleware (pure ASGI)
+# ==========================
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        # The route template is only known after routing, so in-flight is per method
+        http_in_flight.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec(method)
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            http_request_seconds.observe(elapsed, method, route)
+            http_requests_total.inc(method, route, status["code"])
+
+
+# ==========================
+# Mongo command listener
+# ==========================
+_CURSOR_COMMANDS = {"find", "aggregate", "getMore"}
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {}  # (connection, request_id) -> collection
+        self._lock = Lock()
+
+    def started(self, event):
+        command = event.command
+        collection = command.get("collection") if event.command_name == "getMore" else command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "-"
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = collection
+
+    def _collection(self, event) -> str:
+        with self._lock:
+            return self._pending.pop((event.connection_id, event.request_id), "-")
+
+    def succeeded(self, event):
+        collection = self._collection(event)
+        mongo_command_seconds.observe(event.duration_micros / 1e6, collection, event.command_name)
+        if event.command_name in _CURSOR_COMMANDS:
+            cursor = event.reply.get("cursor") or {}
+            batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+            if batch:
+                mongo_documents_returned.inc(collection, event.command_name, amount=len(batch))
+
+    def failed(self, event):
+        collection = self._collection(event)
+        mongo_command_seconds.observe(event.duration_micros / 1e6, collection, event.command_name)
+        mongo_command_failures.inc(collection, event.command_name)
+
+
+def mongo_event_listeners() -> list:
+    """event_listeners for MongoClient/AsyncIOMotorClient ([] when disabled)."""
+    return [MongoCommandMetrics()] if METRICS_ENABLED else []
@@ -0,0 +1,101 @@
+# utils/pagination.py
+import os
+import json
+import base64
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "200"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "1000"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# ==========================
+# Cursor encoding
+# ==========================
+def encode_cursor(doc: dict, sort_fields: list) -> str:
+    """Opaque keyset cursor holding the sort key values of the last row."""
+    values = []
+    for field in sort_fields:
+        value = doc.get(field)
+        if isinstance(value, ObjectId):
+            value = {"$oid": str(value)}
+        elif isinstance(value, datetime):
+            value = {"$date": value.isoformat()}
+        values.append(value)
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_fields: list) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(sort_fields):
+            raise ValueError
+        decoded = []
+        for value in values:
+            if isinstance(value, dict) and "$oid" in value:
+                value = ObjectId(value["$oid"])
+            elif isinstance(value, dict) and "$date" in value:
+                value = datetime.fromisoformat(value["$date"])
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# ==========================
+# Keyset filter
+# ==========================
+def keyset_filter(sort_fields: list, after: str = None) -> dict:
+    """Mongo filter selecting rows strictly after `after` in ascending
+    (sort_fields) order. The last sort field must be unique (_id)."""
+    if not after:
+        return {}
+    values = decode_cursor(after, sort_fields)
+
+    clauses = []
+    for i, field in enumerate(sort_fields):
+        clause = {sort_fields[j]: values[j] for j in range(i)}
+        if values[i] is None:
+            # null sorts before every date, so "after null" is any real value
+            clause[field] = {"$ne": None}
+        else:
+            clause[field] = {"$gt": values[i]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def sort_spec(sort_fields: list) -> list:
+    return [(field, 1) for field in sort_fields]
+
+
+def merge_filters(*filters) -> dict:
+    parts = [f for f in filters if f]
+    if not parts:
+        return {}
+    return parts[0] if len(parts) == 1 else {"$and": parts}
+
+
+def parse_date(value: str, field: str):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{field} must be YYYY-MM-DD")
+
+
+def date_range_filter(date_from: str = None, date_to: str = None) -> dict:
+    """Leaves overlapping [date_from, date_to] (inclusive)."""
+    query = {}
+    start = parse_date(date_from, "date_from")
+    end = parse_date(date_to, "date_to")
+    if end:
+        query["start_date"] = {"$lte": end}
+    if start:
+        query["end_date"] = {"$gte": start}
+    return query
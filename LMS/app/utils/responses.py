@@ -0,0 +1,54 @@
+# utils/responses.py
+"""
+JSON responses encoded in a single pass.
+
+List endpoints build rows holding native values (ObjectId, datetime.date)
+and return them wrapped in FastJSONResponse, which hands them straight to
+orjson. Returning a Response skips jsonable_encoder and response_model
+validation, so each row is walked exactly once; the declared response
+models still describe the shape in OpenAPI.
+"""
+import gzip
+import json
+from datetime import date
+from bson import ObjectId
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json without it
+    orjson = None
+
+MIN_COMPRESS_BYTES = 1024
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, date):  # orjson handles dates natively; stdlib json does not
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def compressed_json_response(request: Request, content) -> Response:
+    """FastJSONResponse, gzipped when the client accepts it and the body is big enough."""
+    body = dumps(content)
+    if len(body) < MIN_COMPRESS_BYTES or "gzip" not in request.headers.get("accept-encoding", ""):
+        return Response(body, media_type="application/json", headers={"Vary": "Accept-Encoding"})
+    return Response(
+        gzip.compress(body, compresslevel=6),
+        media_type="application/json",
+        headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+    )
@@ -0,0 +1,139 @@
+# utils/static_assets.py
+"""
+Pages and static assets built once at startup and served from memory.
+
+- CSS/JS under static/ get content-hashed URLs (/assets/style.<hash>.css)
+  served with a year-long immutable Cache-Control.
+- HTML templates are rendered once, with /static/... references
+  rewritten to the hashed URLs, and served with a strong ETag so
+  browsers revalidate cheaply (304).
+- gzip (and brotli, when the `brotli` package is installed) variants are
+  compressed here, never per request.
+"""
+import gzip
+import hashlib
+import mimetypes
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip-only without it
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PAGE_CACHE_CONTROL = "no-cache"
+MIN_COMPRESS_BYTES = 512
+
+
+class StaticAsset:
+    """One in-memory file plus its precompressed variants."""
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {"identity": body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=11)
+
+    def _pick_encoding(self, accept_encoding: str) -> str:
+        accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and encoding in accepted:
+                return encoding
+        return "identity"
+
+    def etag(self, encoding: str = "identity") -> str:
+        # Strong ETags must differ per byte representation
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"{self.digest}{suffix}"'
+
+    def response(self, request: Request) -> Response:
+        encoding = self._pick_encoding(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": self.etag(encoding),
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        if if_none_match.strip() == "*" or any(
+            tag.strip() in (self.etag(enc) for enc in self.variants) for tag in if_none_match.split(",")
+        ):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding], media_type=self.media_type, headers=headers)
+
+
+# ==========================
+# Build
+# ==========================
+def _media_type(path: Path) -> str:
+    media_type, _ = mimetypes.guess_type(path.name)
+    if media_type and (media_type.startswith("text/") or media_type.endswith("javascript")):
+        media_type += "; charset=utf-8"
+    return media_type or "application/octet-stream"
+
+
+def build_assets(static_dir: str):
+    """Hash every file in static_dir.
+
+    Returns ({hashed_name: StaticAsset}, {"/static/name": "/assets/hashed_name"}).
+    """
+    assets, url_map = {}, {}
+    for path in sorted(Path(static_dir).iterdir()):
+        if not path.is_file():
+            continue
+        body = path.read_bytes()
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        hashed_name = f"{path.stem}.{digest}{path.suffix}"
+        assets[hashed_name] = StaticAsset(body, _media_type(path), IMMUTABLE_CACHE_CONTROL)
+        url_map[f"/static/{path.name}"] = f"/assets/{hashed_name}"
+    return assets, url_map
+
+
+def build_pages(templates_dir: str, names: list, url_map: dict) -> dict:
+    """Render each template once and point it at the hashed asset URLs."""
+    env = Environment(loader=FileSystemLoader(templates_dir), autoescape=True)
+    pages = {}
+    for name in names:
+        html = env.get_template(name).render()
+        for original, hashed in url_map.items():
+            html = html.replace(f'"{original}"', f'"{hashed}"')
+        pages[name] = StaticAsset(html.encode("utf-8"), "text/html; charset=utf-8", PAGE_CACHE_CONTROL)
+    return pages
+
+
+# ==========================
+# Registry (built once per worker)
+# ==========================
+LMS_DIR = Path(__file__).resolve().parents[2]
+STATIC_DIR = LMS_DIR / "static"
+TEMPLATES_DIR = LMS_DIR / "app" / "templates"
+PAGE_NAMES = ["index.html", "employee_dashboard.html", "hr_dashboard.html"]
+
+_assets = {}
+_pages = {}
+
+
+def load_static():
+    """Build pages and assets; called from the app lifespan (idempotent)."""
+    if not _pages:
+        assets, url_map = build_assets(str(STATIC_DIR))
+        _assets.update(assets)
+        _pages.update(build_pages(str(TEMPLATES_DIR), PAGE_NAMES, url_map))
+
+
+def get_page(name: str):
+    load_static()
+    return _pages[name]
+
+
+def get_asset(name: str):
+    load_static()
+    return _assets.get(name)
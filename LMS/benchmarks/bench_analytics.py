@@ -0,0 +1,90 @@
+"""
+Department analytics latency on a large leave collection.
+
+Needs a reachable MongoDB (MONGO_URI); seeds a scratch database that is
+dropped afterwards. Run from the LMS directory:
+    python -m benchmarks.bench_analytics --leaves 100000
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+DEPARTMENTS = ["IT", "HR", "Finance", "Sales", "Operations", "Legal", "Support", "Marketing"]
+STATUSES = ["Pending", "Approved", "Rejected"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytics pipeline latency")
+    parser.add_argument("--leaves", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--db", default="lms_bench", help="scratch database (dropped at the end)")
+    args = parser.parse_args()
+
+    os.environ["MONGO_DB_NAME"] = args.db
+
+    from app.db.mongodb import get_client, leave_collection
+    from app.db.indexes import ensure_indexes
+    from app.services.analytics_service import get_leave_analytics, invalidate_analytics
+
+    async def seed():
+        await leave_collection.delete_many({})
+        rng = random.Random(42)
+        base = datetime(2024, 1, 1)
+        batch = []
+        for i in range(args.leaves):
+            start = base + timedelta(days=rng.randrange(730))
+            days = rng.randint(1, 5)
+            batch.append({
+                "employee_id": f"EMP{rng.randrange(5000):05d}",
+                "employee_dept": rng.choice(DEPARTMENTS),
+                "title": "bench",
+                "start_date": start,
+                "end_date": start + timedelta(days=days - 1),
+                "days": days,
+                "status": rng.choice(STATUSES),
+                "submitted_at": start - timedelta(days=7),
+            })
+            if len(batch) == 10_000:
+                await leave_collection.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await leave_collection.insert_many(batch, ordered=False)
+        await ensure_indexes()
+
+    async def timed(**filters):
+        cold = []
+        for _ in range(args.runs):
+            invalidate_analytics()
+            start = time.perf_counter()
+            await get_leave_analytics(**filters)
+            cold.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            await get_leave_analytics(**filters)
+        warm = (time.perf_counter() - start) * 1000 / args.runs
+        return statistics.median(cold), max(cold), warm
+
+    async def run():
+        await seed()
+        results = {
+            "all leaves": await timed(),
+            "year=2025": await timed(year=2025),
+            "year=2025, dept=IT": await timed(year=2025, department="IT"),
+        }
+        await get_client().drop_database(args.db)
+        return results
+
+    results = asyncio.run(run())
+    print(f"leaves seeded: {args.leaves}")
+    for label, (p50, worst, warm) in results.items():
+        print(f"{label:22s} pipeline p50 {p50:8.1f} ms  max {worst:8.1f} ms  | cached {warm:6.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
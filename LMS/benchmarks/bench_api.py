@@ -0,0 +1,280 @@
+"""
+End-to-end API benchmark: drives the real FastAPI app in-process.
+
+Seeds users and leaves, then runs each hot path at a fixed concurrency
+and reports p50/p95/p99 latency, throughput and peak RSS per endpoint:
+
+    Employee_login, /submit, /my_leaves, /leave_requests,
+    approve_leave, /employee_leaves
+
+Results can be written as JSON and compared against an earlier run, so
+regressions show up between commits. Run from the LMS directory:
+
+    python -m benchmarks.bench_api --users 1000 --leaves 20000 --output bench.json
+    python -m benchmarks.bench_api --compare bench.json           # deltas vs. baseline
+    python -m benchmarks.bench_api --mongomock --users 200        # no MongoDB needed
+
+Without --mongomock it needs a reachable MongoDB (MONGO_URI) and uses a
+scratch database that is dropped afterwards.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import resource
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timedelta
+
+DEPARTMENTS = ["IT", "HR", "Finance", "Sales", "Operations", "Legal", "Support", "Marketing"]
+PASSWORD = "bench-password"
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(self_rss, child_rss) / scale, 1)
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _use_mongomock():
+    try:
+        import mongomock_motor
+        import motor.motor_asyncio
+    except ImportError:
+        sys.exit("--mongomock needs `pip install mongomock-motor`")
+    from mongomock.collection import BulkOperationBuilder
+
+    # Newer pymongo passes sort=/hint= to bulk builders; mongomock doesn't accept them
+    for method_name in ("add_update", "add_replace", "add_delete"):
+        original = getattr(BulkOperationBuilder, method_name)
+
+        def compat(self, *a, _original=original, **kw):
+            kw.pop("sort", None)
+            kw.pop("hint", None)
+            return _original(self, *a, **kw)
+        setattr(BulkOperationBuilder, method_name, compat)
+
+    # with_options() (read-only handles) returns an unwrapped sync collection; rewrap it
+    collection_cls = mongomock_motor.AsyncMongoMockCollection
+    collection_cls.with_options = lambda self, **kw: collection_cls(
+        self.database, self._AsyncMongoMockCollection__collection.with_options(**kw)
+    )
+    motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    os.environ.setdefault("EVENTS_MODE", "poll")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API hot-path latency / throughput")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--leaves", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--logins", type=int, default=100, help="login requests (bcrypt-bound)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--db", default="lms_bench", help="scratch database (dropped at the end)")
+    parser.add_argument("--mongomock", action="store_true", help="in-memory MongoDB (no server needed)")
+    parser.add_argument("--output", help="write results as JSON here")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ["MONGO_DB_NAME"] = args.db
+    os.environ.setdefault("METRICS_ENABLED", "false")
+    if args.mongomock:
+        _use_mongomock()
+
+    import httpx
+    from main import app
+    from app.db.mongodb import get_client, users_collection, leave_collection
+    from app.services.password_pool import (
+        hash_password, hash_password_async, PASSWORD_POOL_WORKERS, PASSWORD_POOL_MAX_QUEUE
+    )
+    from app.services.auth_service import create_access_token
+
+    rng = random.Random(args.seed)
+
+    async def seed():
+        await users_collection.delete_many({})
+        await leave_collection.delete_many({})
+        hashed = hash_password(PASSWORD)  # one bcrypt for everyone
+        users = [{
+            "name": f"Bench {i}",
+            "email": f"bench{i}@example.com",
+            "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+            "password": hashed,
+            "role": "Employee",
+            "employee_id": f"BEMP{i:06d}",
+        } for i in range(args.users)]
+        users.append({
+            "name": "Bench Manager", "email": "bench-manager@example.com", "department": "IT",
+            "password": hashed, "role": "Manager", "manager_id": "BMAN000001",
+        })
+        result = await users_collection.insert_many(users)
+        user_ids = [str(i) for i in result.inserted_ids]
+
+        base = datetime(2024, 1, 1)
+        batch = []
+        for i in range(args.leaves):
+            user = users[rng.randrange(args.users)]
+            start = base + timedelta(days=rng.randrange(730))
+            days = rng.randint(1, 5)
+            batch.append({
+                "employee_id": user["employee_id"],
+                "employee_name": user["name"],
+                "employee_email": user["email"],
+                "employee_dept": user["department"],
+                "title": "bench",
+                "start_date": start,
+                "end_date": start + timedelta(days=days - 1),
+                "days": days,
+                "description": "bench",
+                "leave_type": "General",
+                "status": rng.choice(["Pending", "Approved", "Rejected"]),
+                "submitted_at": start - timedelta(days=7),
+            })
+            if len(batch) == 10_000:
+                await leave_collection.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await leave_collection.insert_many(batch, ordered=False)
+
+        employee_tokens = [
+            create_access_token({"user_id": uid, "email": users[i]["email"], "role": "Employee"})
+            for i, uid in enumerate(user_ids[:-1])
+        ]
+        manager_token = create_access_token({"user_id": user_ids[-1], "email": users[-1]["email"], "role": "Manager"})
+        return users, employee_tokens, manager_token
+
+    async def measure(name, http, total, make_request, concurrency=None):
+        concurrency = concurrency or args.concurrency
+        latencies, statuses = [], {}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with semaphore:
+                method, url, kwargs = make_request(i)
+                started = time.perf_counter()
+                response = await http.request(method, url, **kwargs)
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[one(i) for i in range(total)])
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        return name, {
+            "requests": total,
+            "concurrency": concurrency,
+            "p50_ms": round(_percentile(latencies, 50), 2),
+            "p95_ms": round(_percentile(latencies, 95), 2),
+            "p99_ms": round(_percentile(latencies, 99), 2),
+            "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+            "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+            "peak_rss_mb": _peak_rss_mb(),
+            "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        }
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            users, employee_tokens, manager_token = await seed()
+            await hash_password_async(PASSWORD)  # start the bcrypt workers outside the timings
+            pending = [
+                str(doc["_id"]) async for doc in
+                leave_collection.find({"status": "Pending"}, {"_id": 1}).limit(args.requests)
+            ]
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+                def emp(i):
+                    return {"Authorization": f"Bearer {employee_tokens[i % len(employee_tokens)]}"}
+                manager = {"Authorization": f"Bearer {manager_token}"}
+                # Future Mondays, one week apart per request: no overlaps, always working days
+                first_monday = datetime(2030, 1, 7)
+
+                plan = [
+                    ("Employee_login", args.logins, lambda i: (
+                        "POST", "/api/v1/Emp_auth/Employee_login",
+                        {"json": {"email": users[i % args.users]["email"], "password": PASSWORD}})),
+                    ("submit", args.requests, lambda i: (
+                        "POST", "/api/v1/Emp_Dash/submit",
+                        {"headers": emp(i), "json": {
+                            "leaveTitle": "bench", "description": "bench",
+                            "startDate": (first_monday + timedelta(weeks=i)).strftime("%Y-%m-%d"),
+                            "endDate": (first_monday + timedelta(weeks=i, days=1)).strftime("%Y-%m-%d"),
+                        }})),
+                    ("my_leaves", args.requests, lambda i: (
+                        "GET", "/api/v1/Emp_Dash/my_leaves", {"headers": emp(i)})),
+                    ("leave_requests", args.requests, lambda i: (
+                        "GET", "/api/v1/Man_Dash/leave_requests", {"headers": manager})),
+                    ("approve_leave", len(pending), lambda i: (
+                        "PUT", f"/api/v1/Man_Dash/approve_leave/{pending[i]}", {"headers": manager})),
+                    ("employee_leaves", args.requests, lambda i: (
+                        "GET", "/api/v1/Man_Dash/employee_leaves", {"headers": manager})),
+                ]
+                # Logins beyond the bcrypt pool's capacity would only measure the 429 path
+                pool_capacity = PASSWORD_POOL_WORKERS + PASSWORD_POOL_MAX_QUEUE
+                results = {}
+                for name, total, make_request in plan:
+                    if total:
+                        concurrency = min(args.concurrency, pool_capacity) if name == "Employee_login" else None
+                        key, stats = await measure(name, http, total, make_request, concurrency)
+                        results[key] = stats
+
+            if not args.mongomock:
+                await get_client().drop_database(args.db)
+            return results
+
+    results = asyncio.run(run())
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "backend": "mongomock" if args.mongomock else "mongodb",
+        "python": platform.python_version(),
+        "params": {"users": args.users, "leaves": args.leaves, "requests": args.requests,
+                   "logins": args.logins, "concurrency": args.concurrency},
+        "endpoints": results,
+    }
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f).get("endpoints", {})
+
+    print(f"commit {report['commit']}  backend {report['backend']}  users {args.users}  leaves {args.leaves}")
+    print(f"{'endpoint':16s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'req/s':>9s} {'RSS MB':>8s}  status")
+    for name, stats in results.items():
+        line = (f"{name:16s} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} {stats['p99_ms']:9.2f} "
+                f"{stats['throughput_rps']:9.1f} {stats['peak_rss_mb']:8.1f}  {stats['status_codes']}")
+        if name in baseline and baseline[name].get("p95_ms"):
+            delta = (stats["p95_ms"] - baseline[name]["p95_ms"]) / baseline[name]["p95_ms"] * 100
+            line += f"  p95 {delta:+.1f}% vs baseline"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
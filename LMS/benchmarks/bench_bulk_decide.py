@@ -0,0 +1,71 @@
+"""
+Per-item approve/reject vs. one bulk decision batch.
+
+Needs a reachable MongoDB (MONGO_URI); uses a scratch database that is
+dropped afterwards. Run from the LMS directory:
+    python -m benchmarks.bench_bulk_decide --leaves 200
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from datetime import datetime
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk vs per-item leave decisions")
+    parser.add_argument("--leaves", type=int, default=200)
+    parser.add_argument("--db", default="lms_bench", help="scratch database (dropped at the end)")
+    args = parser.parse_args()
+
+    os.environ["MONGO_DB_NAME"] = args.db
+    os.environ["BULK_DECISION_MAX"] = str(max(args.leaves, 1))
+
+    from app.db.mongodb import get_client, leave_collection
+    from app.services.auth_service import decide_leave, decide_leaves_bulk
+
+    async def seed(n):
+        docs = [{
+            "employee_id": f"EMP{i:05d}",
+            "employee_name": "Bench",
+            "title": "bench",
+            "start_date": datetime(2025, 1, 1),
+            "end_date": datetime(2025, 1, 2),
+            "days": 2,
+            "status": "Pending",
+            "submitted_at": datetime.now(),
+        } for i in range(n)]
+        result = await leave_collection.insert_many(docs)
+        return [str(i) for i in result.inserted_ids]
+
+    async def run():
+        await leave_collection.delete_many({})
+
+        ids = await seed(args.leaves)
+        start = time.perf_counter()
+        for i, leave_id in enumerate(ids):
+            await decide_leave(leave_id, "Approved" if i % 2 else "Rejected", "bench")
+        per_item = time.perf_counter() - start
+
+        ids = await seed(args.leaves)
+        start = time.perf_counter()
+        report = await decide_leaves_bulk(
+            [(leave_id, "Approved" if i % 2 else "Rejected") for i, leave_id in enumerate(ids)], "bench"
+        )
+        bulk = time.perf_counter() - start
+        assert report["updated"] == args.leaves, report
+
+        await get_client().drop_database(args.db)
+        return per_item, bulk
+
+    per_item, bulk = asyncio.run(run())
+    print(f"decisions        : {args.leaves}")
+    print(f"per-item PUTs    : {per_item * 1000:8.1f} ms  ({args.leaves / per_item:8.1f} decisions/sec)")
+    print(f"one bulk batch   : {bulk * 1000:8.1f} ms  ({args.leaves / bulk:8.1f} decisions/sec)")
+    print(f"speedup          : {per_item / bulk:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Team-calendar bitmaps: build time, render time and payload size.
+
+Synthesizes a department's leaves (no database) and compares the
+calendar payload against the equivalent /employee_leaves rows a client
+would otherwise pull and expand. Run from the LMS directory:
+
+    python -m benchmarks.bench_calendar --employees 500 --months 12
+"""
+import sys
+import gzip
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Team calendar payload size / latency")
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--leaves-per-employee", type=int, default=8)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from app.services.calendar_service import build_grids, render_calendar, month_span, CALENDAR_MAX_MONTHS
+    from app.routers.Man_auth import employee_leave_row
+    from app.utils.responses import dumps
+
+    months = month_span(args.year, 1, min(args.months, CALENDAR_MAX_MONTHS))
+    rng = random.Random(args.seed)
+    base = datetime(args.year, 1, 1)
+    leaves = []
+    for e in range(args.employees):
+        for _ in range(args.leaves_per_employee):
+            start = base + timedelta(days=rng.randrange(len(months) * 30))
+            leaves.append({
+                "_id": ObjectId(),
+                "employee_id": f"EMP{e:04d}",
+                "employee_name": f"Employee {e}",
+                "title": "Annual leave",
+                "start_date": start,
+                "end_date": start + timedelta(days=rng.randint(0, 4)),
+                "status": rng.choice(["Pending", "Approved", "Approved"]),
+            })
+
+    started = time.perf_counter()
+    grids = build_grids("Bench", months, leaves)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    body = dumps(render_calendar("Bench", months, grids))
+    render_ms = (time.perf_counter() - started) * 1000
+
+    # Incremental update: reject one leave in every cached month it touches
+    started = time.perf_counter()
+    rejected = {**leaves[0], "status": "Rejected"}
+    for grid in grids.values():
+        grid.apply(rejected)
+    update_us = (time.perf_counter() - started) * 1e6
+
+    rows = dumps([employee_leave_row(lv) for lv in leaves])
+
+    print(f"employees x months  : {args.employees} x {len(months)} ({len(leaves)} leaves)")
+    print(f"build grids         : {build_ms:8.2f} ms")
+    print(f"render + encode     : {render_ms:8.2f} ms")
+    print(f"incremental update  : {update_us:8.1f} us")
+    print(f"calendar payload    : {len(body) / 1024:8.1f} KB ({len(gzip.compress(body)) / 1024:.1f} KB gzip)")
+    print(f"leave rows payload  : {len(rows) / 1024:8.1f} KB ({len(gzip.compress(rows)) / 1024:.1f} KB gzip)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
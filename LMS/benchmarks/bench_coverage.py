@@ -0,0 +1,132 @@
+"""
+Overlap check and department coverage latency on a busy department.
+
+Seeds one department with thousands of leaves (plus noise in other
+departments) and times the two queries behind submit / approve:
+find_own_overlaps (employee_start index) and coverage_report
+(dept_start index + sweep line). Target: p95 under 10 ms.
+
+Needs a reachable MongoDB (MONGO_URI); seeds a scratch database that is
+dropped afterwards. Run from the LMS directory:
+    python -m benchmarks.bench_coverage --employees 2000 --leaves 20000
+    python -m benchmarks.bench_coverage --mongomock            # no server, not representative
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+DEPARTMENT = "Operations"
+OTHER_DEPARTMENTS = ["IT", "HR", "Finance", "Sales"]
+
+
+def _p95(values: list) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overlap / coverage query latency")
+    parser.add_argument("--employees", type=int, default=2000, help="employees in the measured department")
+    parser.add_argument("--leaves", type=int, default=20_000, help="leaves in the measured department")
+    parser.add_argument("--noise", type=int, default=50_000, help="leaves in other departments")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--window-days", type=int, default=14)
+    parser.add_argument("--db", default="lms_bench", help="scratch database (dropped at the end)")
+    parser.add_argument("--mongomock", action="store_true", help="in-memory MongoDB (no server needed)")
+    args = parser.parse_args()
+
+    os.environ["MONGO_DB_NAME"] = args.db
+    if args.mongomock:
+        from benchmarks.bench_api import _use_mongomock
+        _use_mongomock()
+
+    from app.db.mongodb import get_client, leave_collection, users_collection
+    from app.db.indexes import ensure_indexes
+    from app.services.conflict_service import find_own_overlaps, coverage_report, _off_per_day
+
+    rng = random.Random(42)
+    base = datetime(2024, 1, 1)
+
+    def leave(department: str, employee: int) -> dict:
+        start = base + timedelta(days=rng.randrange(730))
+        days = rng.randint(1, 5)
+        return {
+            "employee_id": f"{department[:3].upper()}{employee:05d}",
+            "employee_name": f"Employee {employee}",
+            "employee_dept": department,
+            "title": "bench",
+            "start_date": start,
+            "end_date": start + timedelta(days=days - 1),
+            "days": days,
+            "status": rng.choice(["Pending", "Approved", "Approved", "Rejected"]),
+        }
+
+    async def seed():
+        await leave_collection.delete_many({})
+        await users_collection.delete_many({})
+        await users_collection.insert_many([
+            {"role": "Employee", "department": DEPARTMENT, "employee_id": f"OPE{i:05d}", "email": f"ope{i}@bench"}
+            for i in range(args.employees)
+        ])
+        docs = [leave(DEPARTMENT, rng.randrange(args.employees)) for _ in range(args.leaves)]
+        docs += [leave(rng.choice(OTHER_DEPARTMENTS), rng.randrange(5000)) for _ in range(args.noise)]
+        for i in range(0, len(docs), 10_000):
+            await leave_collection.insert_many(docs[i:i + 10_000], ordered=False)
+        await ensure_indexes()
+
+    async def timed(make_call) -> list:
+        samples = []
+        for _ in range(args.runs):
+            call = make_call()
+            started = time.perf_counter()
+            await call
+            samples.append((time.perf_counter() - started) * 1000)
+        return samples
+
+    def window():
+        start = base + timedelta(days=rng.randrange(700))
+        return start, start + timedelta(days=args.window_days - 1)
+
+    async def run():
+        await seed()
+        results = {
+            "own overlap": await timed(
+                lambda: find_own_overlaps(f"OPE{rng.randrange(args.employees):05d}", *window())),
+            "coverage (summary)": await timed(
+                lambda: coverage_report(DEPARTMENT, *window(), include_leaves=False)),
+            "coverage (approve)": await timed(
+                lambda: coverage_report(DEPARTMENT, *window(), statuses=["Approved"])),
+        }
+        # CPU side alone: sweep line over one window's department leaves (backend-independent)
+        start, end = window()
+        overlapping = await leave_collection.find({
+            "employee_dept": DEPARTMENT, "start_date": {"$lte": end}, "end_date": {"$gte": start},
+        }).to_list(length=None)
+        sweep = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            _off_per_day(overlapping, start, end)
+            sweep.append((time.perf_counter() - started) * 1000)
+        results[f"sweep line ({len(overlapping)} lv)"] = sweep
+
+        if not args.mongomock:
+            await get_client().drop_database(args.db)
+        return results
+
+    results = asyncio.run(run())
+    print(f"{DEPARTMENT}: {args.employees} employees, {args.leaves} leaves (+{args.noise} elsewhere), "
+          f"{args.window_days}-day window, backend {'mongomock' if args.mongomock else 'mongodb'}")
+    for label, samples in results.items():
+        p95 = _p95(samples)
+        print(f"{label:24s} p50 {statistics.median(samples):7.2f} ms  p95 {p95:7.2f} ms"
+              f"  {'ok' if p95 < 10 else 'over 10 ms'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
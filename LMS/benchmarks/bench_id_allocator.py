@@ -0,0 +1,71 @@
+"""
+Hi/lo id allocator: throughput and a duplicate check under concurrency.
+
+Several worker processes each run many concurrent allocations against a
+shared counter document; every id is collected and checked for
+duplicates. Compares the configured block size with block size 1 (one
+round trip per id, the old behaviour).
+
+Needs a reachable MongoDB (MONGO_URI); uses a scratch database that is
+dropped afterwards. Run from the LMS directory:
+    python -m benchmarks.bench_id_allocator --workers 4 --ids 5000 --block-size 50
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+
+
+def _allocate(db_name: str, counter_id: str, block_size: int, count: int, concurrency: int) -> list:
+    os.environ["MONGO_DB_NAME"] = db_name
+    from app.db.mongodb import db
+    from app.db.counters import BlockAllocator
+
+    allocator = BlockAllocator(counter_id, "EMP", block_size, collection=db.counters)
+
+    async def run():
+        per_task = count // concurrency
+        results = await asyncio.gather(*[
+            asyncio.gather(*[allocator.next_id() for _ in range(per_task)]) for _ in range(concurrency)
+        ])
+        return [emp_id for batch in results for emp_id in batch]
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Block id allocator throughput / uniqueness")
+    parser.add_argument("--workers", type=int, default=4, help="processes sharing the counter")
+    parser.add_argument("--ids", type=int, default=5000, help="ids per worker")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent tasks per worker")
+    parser.add_argument("--block-size", type=int, default=50)
+    parser.add_argument("--db", default="lms_bench", help="scratch database (dropped at the end)")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    failed = False
+    for block_size in (1, args.block_size):
+        counter_id = f"bench_{block_size}_{int(time.time())}"
+        start = time.perf_counter()
+        with ctx.Pool(args.workers) as pool:
+            batches = pool.starmap(
+                _allocate,
+                [(args.db, counter_id, block_size, args.ids, args.concurrency)] * args.workers,
+            )
+        elapsed = time.perf_counter() - start
+        ids = [emp_id for batch in batches for emp_id in batch]
+        duplicates = len(ids) - len(set(ids))
+        failed = failed or duplicates > 0
+        print(f"block={block_size:5d}  {len(ids):7d} ids in {elapsed:6.2f}s  "
+              f"({len(ids) / elapsed:10,.0f} ids/sec)  duplicates={duplicates}")
+
+    os.environ["MONGO_DB_NAME"] = args.db
+    from app.db.mongodb import get_client
+    asyncio.run(get_client().drop_database(args.db))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
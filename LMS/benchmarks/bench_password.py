@@ -0,0 +1,58 @@
+"""
+Login throughput for the bcrypt process pool.
+
+Run from the LMS directory:
+    python -m benchmarks.bench_password --logins 200 --rounds 12
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bcrypt logins/sec per core")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=None, help="override BCRYPT_ROUNDS")
+    parser.add_argument("--workers", type=int, default=None, help="override PASSWORD_POOL_WORKERS")
+    args = parser.parse_args()
+
+    # Must be set before the pool module reads its env
+    if args.rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    if args.workers:
+        os.environ["PASSWORD_POOL_WORKERS"] = str(args.workers)
+    os.environ.setdefault("PASSWORD_POOL_MAX_QUEUE", str(args.logins))
+
+    from app.services import password_pool as pp
+
+    hashed = pp.hash_password("benchmark-password")
+
+    # Inline baseline (what the request thread used to do)
+    n_inline = max(args.logins // 10, 5)
+    start = time.perf_counter()
+    for _ in range(n_inline):
+        pp.verify_password("benchmark-password", hashed)
+    inline_rate = n_inline / (time.perf_counter() - start)
+
+    async def run_pool():
+        # Warm up workers so process spawn is not measured
+        await asyncio.gather(*[pp.verify_password_async("x", hashed) for _ in range(pp.PASSWORD_POOL_WORKERS)])
+        start = time.perf_counter()
+        await asyncio.gather(*[pp.verify_password_async("benchmark-password", hashed) for _ in range(args.logins)])
+        return args.logins / (time.perf_counter() - start)
+
+    pool_rate = asyncio.run(run_pool())
+    pp.shutdown_password_pool()
+
+    workers = pp.PASSWORD_POOL_WORKERS
+    print(f"bcrypt rounds       : {pp.BCRYPT_ROUNDS}")
+    print(f"inline (1 thread)   : {inline_rate:8.1f} logins/sec")
+    print(f"pool ({workers} workers)   : {pool_rate:8.1f} logins/sec")
+    print(f"pool per core       : {pool_rate / workers:8.1f} logins/sec/core")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+List-endpoint serialization: previous path vs. orjson single pass.
+
+Builds /employee_leaves rows from synthetic Mongo documents and times:
+  - legacy : str(ObjectId) + strftime per row, returned as a plain list
+             (jsonable_encoder walk, then stdlib json.dumps via JSONResponse)
+  - fast   : native ObjectId / date rows rendered by FastJSONResponse
+
+No database needed. Run from the LMS directory:
+    python -m benchmarks.bench_serialization --rows 10000
+"""
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON encoding cost of leave listings")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from bson import ObjectId
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.utils.responses import FastJSONResponse, orjson
+    from app.routers.Man_auth import employee_leave_row
+
+    rng = random.Random(args.seed)
+    base = datetime(2024, 1, 1)
+    docs = []
+    for i in range(args.rows):
+        start = base + timedelta(days=rng.randrange(730))
+        docs.append({
+            "_id": ObjectId(),
+            "employee_name": f"Employee {i % 500}",
+            "employee_id": f"EMP{i % 500:03d}",
+            "title": "Annual leave",
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.randint(0, 4)),
+            "status": rng.choice(["Pending", "Approved", "Rejected"]),
+        })
+
+    def legacy_row(lv):
+        start, end = lv.get("start_date"), lv.get("end_date")
+        return {
+            "id": str(lv.get("_id")),
+            "employee_name": lv.get("employee_name", "Unknown"),
+            "employee_id": lv.get("employee_id", "Unknown"),
+            "leaveTitle": lv.get("title", "Untitled"),
+            "startDate": start.strftime("%Y-%m-%d") if start else "-",
+            "endDate": end.strftime("%Y-%m-%d") if end else "-",
+            "status": lv.get("status", "Pending"),
+        }
+
+    def legacy():
+        return JSONResponse(jsonable_encoder([legacy_row(lv) for lv in docs])).body
+
+    def fast():
+        return FastJSONResponse([employee_leave_row(lv) for lv in docs]).body
+
+    if json.loads(legacy()) != json.loads(fast()):
+        sys.exit("fast path output differs from the legacy path")
+
+    legacy_s = _best_of(args.repeat, legacy)
+    fast_s = _best_of(args.repeat, fast)
+
+    print(f"rows                : {args.rows}")
+    print(f"encoder             : {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(f"legacy (map+encoder): {legacy_s * 1000:8.2f} ms")
+    print(f"fast (single pass)  : {fast_s * 1000:8.2f} ms")
+    print(f"speedup             : {legacy_s / fast_s:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
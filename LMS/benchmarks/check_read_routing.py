@@ -0,0 +1,101 @@
+"""
+Verify read-preference routing of the collection handles.
+
+Checks that the *_readonly handles carry MONGO_READ_PREFERENCE /
+MONGO_READ_CONCERN and the read/write handles stay on the primary. It
+then runs a read through each handle and records the $readPreference
+each command actually sent, and which server answered.
+
+Needs a replica set; a local single-node one is enough as a stand-in:
+
+    docker run -d --name lms-rs -p 27017:27017 mongo:7 --replSet rs0
+    docker exec lms-rs mongosh --quiet --eval "rs.initiate()"
+
+Run from the LMS directory:
+    MONGO_URI="mongodb://localhost:27017/?replicaSet=rs0" \\
+    MONGO_READ_PREFERENCE=secondaryPreferred python -m benchmarks.check_read_routing
+"""
+import os
+import sys
+import asyncio
+import argparse
+from pymongo import monitoring
+
+READ_COMMANDS = ("find", "aggregate", "count")
+
+
+class _ReadRecorder(monitoring.CommandListener):
+    def __init__(self):
+        self.reads = []
+
+    def started(self, event):
+        if event.command_name in READ_COMMANDS:
+            mode = event.command.get("$readPreference", {}).get("mode", "primary")
+            self.reads.append((event.command.get(event.command_name), mode, event.connection_id))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-preference routing check")
+    parser.add_argument("--db", default="lms_routing_check", help="scratch database (dropped at the end)")
+    args = parser.parse_args()
+
+    os.environ["MONGO_DB_NAME"] = args.db
+    os.environ.setdefault("MONGO_READ_PREFERENCE", "secondaryPreferred")
+    recorder = _ReadRecorder()
+    monitoring.register(recorder)  # must precede client creation
+
+    from app.db import mongodb
+
+    expected = mongodb.readonly_options()["read_preference"].mongos_mode
+    handles = {
+        "leave_collection": (mongodb.leave_collection, "primary"),
+        "users_collection": (mongodb.users_collection, "primary"),
+        "leave_collection_readonly": (mongodb.leave_collection_readonly, expected),
+        "users_collection_readonly": (mongodb.users_collection_readonly, expected),
+    }
+
+    async def run():
+        failures = []
+        if not await mongodb.connect_mongo():
+            sys.exit(f"MongoDB unreachable: {mongodb.mongo_state['error']}")
+        topology = mongodb.get_client().topology_description.topology_type_name
+        print(f"topology {topology}  MONGO_READ_PREFERENCE={mongodb.MONGO_READ_PREFERENCE}  "
+              f"maxStalenessSeconds={mongodb.MONGO_MAX_STALENESS_SECONDS}  readConcern={mongodb.MONGO_READ_CONCERN or '-'}")
+        if not topology.startswith("ReplicaSet"):
+            print("warning: not a replica set; the server ignores read preference")
+
+        # Write on the primary handle so the reads have something to find
+        await mongodb.leave_collection.insert_one({"routing_check": True})
+        await mongodb.users_collection.insert_one({"routing_check": True})
+
+        print(f"{'handle':28s} {'configured':20s} {'sent':20s} server")
+        for name, (handle, want) in handles.items():
+            configured = handle.read_preference.mongos_mode
+            recorder.reads.clear()
+            await handle.find_one({"routing_check": True})
+            sent = recorder.reads[-1][1] if recorder.reads else "-"
+            server = recorder.reads[-1][2] if recorder.reads else "-"
+            print(f"{name:28s} {configured:20s} {sent:20s} {server}")
+            if configured != want or (topology.startswith("ReplicaSet") and sent != want):
+                failures.append(name)
+
+        await mongodb.get_client().drop_database(args.db)
+        mongodb.close_mongo()
+        return failures
+
+    failures = asyncio.run(run())
+    if failures:
+        print(f"FAILED: {', '.join(failures)} not routed as configured")
+        return 1
+    print("ok: writes and read-your-own-write handles on primary, list/analytics handles routed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,55 @@
+import time
+STARTED_AT = time.perf_counter()  # before the app imports, so boot_ms covers them
+
 import os
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
+from app.services.password_pool import shutdown_password_pool, password_pool_stats
+from app.services.events_service import start_event_watcher, stop_event_watcher, hub
+from app.db.indexes import ensure_indexes
+from app.db.mongodb import connect_mongo, close_mongo, ping, pool_state
+from app.utils.static_assets import load_static, get_page, get_asset
+from app.utils.logger import logger, log_stats, stop_logging, RequestIdMiddleware, REQUEST_ID_HEADER
+from app.utils.metrics import METRICS_ENABLED, MetricsMiddleware, register_collector, render_metrics
 
 # ==============================
 # FastAPI app setup
 # ==============================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-app = FastAPI(title="Employee Leave Management System - Unified Backend")
+ENSURE_INDEXES_ON_STARTUP = os.getenv("ENSURE_INDEXES_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+boot_state = {"boot_ms": None}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    load_static()
+    if not await connect_mongo():
+        # Keep serving; /readyz stays 503 until a ping succeeds
+        logger.error("MongoDB unreachable at startup: %s", pool_state()["error"])
+    if ENSURE_INDEXES_ON_STARTUP:
+        try:
+            await ensure_indexes()
+        except Exception as e:
+            # Serve anyway; `python -m app.db.indexes` can be rerun by hand
+            logger.error("Index bootstrap failed: %s", e)
+    start_event_watcher()
+    boot_state["boot_ms"] = round((time.perf_counter() - STARTED_AT) * 1000, 2)
+    logger.info("Worker %s ready in %.0f ms (mongo connect %s ms)",
+                os.getpid(), boot_state["boot_ms"], pool_state()["connect_ms"])
+    yield
+    await stop_event_watcher()
+    shutdown_password_pool()
+    close_mongo()
+    stop_logging()
 
-templates = Jinja2Templates(directory="app/templates")
-app.mount("/static", StaticFiles(directory="static"), name="static")
+
+app = FastAPI(title="Employee Leave Management System - Unified Backend", lifespan=lifespan)
+
+# Legacy unhashed URLs; pages reference the hashed /assets/... copies
+app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
 
 # ==============================
 # CORS setup
@@ -23,12 +60,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", REQUEST_ID_HEADER],
 )
 
+# Wraps CORS and routing; skipped entirely when disabled
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Correlation id for log records; added last so it wraps everything above
+app.add_middleware(RequestIdMiddleware)
+
 # ==============================
 # Import routers
 # ==============================
 from app.routers import Emp_auth, Man_auth
+from app.services.principal_cache import cache_stats
+from app.utils.business_days import business_days_cache_stats
+from app.services.analytics_service import analytics_cache
+from app.services.calendar_service import calendar_cache
+from app.services.version_service import etag_stats
 
 app.include_router(Emp_auth.router)
 app.include_router(Emp_auth.Emp_router)
@@ -38,19 +88,30 @@ app.include_router(Man_auth.Man_router)
 # ==============================
 # HTML Routes (No auth here)
 # ==============================
+# Pre-rendered at startup; served from memory with ETag / 304
 @app.get("/", response_class=HTMLResponse)
 def index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return get_page("index.html").response(request)
 
 @app.get("/employee_dashboard", response_class=HTMLResponse)
 def employee_dashboard(request: Request):
     # Page loads regardless of auth
-    return templates.TemplateResponse("employee_dashboard.html", {"request": request})
+    return get_page("employee_dashboard.html").response(request)
 
 @app.get("/hr_dashboard", response_class=HTMLResponse)
 def hr_dashboard(request: Request):
     # Page loads regardless of auth
-    return templates.TemplateResponse("hr_dashboard.html", {"request": request})
+    return get_page("hr_dashboard.html").response(request)
+
+# ==============================
+# Content-hashed static assets (immutable)
+# ==============================
+@app.get("/assets/{filename}")
+def hashed_asset(filename: str, request: Request):
+    asset = get_asset(filename)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return asset.response(request)
 
 # ==============================
 # Test API
@@ -58,3 +119,58 @@ def hr_dashboard(request: Request):
 @app.get("/api/v1/test")
 def test():
     return {"message": "Unified backend connected successfully!"}
+
+# ==============================
+# Liveness / readiness probes
+# ==============================
+@app.get("/healthz", include_in_schema=False)
+def healthz():
+    """Liveness: the process is up. Never touches MongoDB."""
+    return {"status": "ok", "pid": os.getpid(), "boot_ms": boot_state["boot_ms"], "mongo": pool_state()}
+
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: startup finished and MongoDB answers a ping."""
+    ready = boot_state["boot_ms"] is not None and await ping()
+    body = {"status": "ready" if ready else "not ready", "pid": os.getpid(), "mongo": pool_state()}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+# ==============================
+# Cache stats (scrape)
+# ==============================
+@app.get("/api/v1/cache_stats")
+def get_cache_stats():
+    return {
+        **cache_stats(),
+        "analytics": analytics_cache.stats(),
+        "calendar": calendar_cache.stats(),
+        "business_days": business_days_cache_stats(),
+        "etags": etag_stats(),
+    }
+
+# ==============================
+# Prometheus metrics
+# ==============================
+@register_collector
+def _pool_and_cache_gauges():
+    pool = password_pool_stats()
+    samples = [
+        ("lms_password_pool_in_flight", "gauge", "bcrypt jobs running or queued", pool["in_flight"]),
+        ("lms_password_pool_rejected_total", "counter", "bcrypt jobs shed with 429", pool["rejected"]),
+        ("lms_log_records_dropped_total", "counter", "log records dropped on a full queue", log_stats()["dropped"]),
+        ("lms_event_subscribers", "gauge", "open SSE connections", hub.stats()["subscribers"]),
+        ("lms_events_published_total", "counter", "leave events fanned out", hub.stats()["published"]),
+    ]
+    caches = {**cache_stats(), "analytics": analytics_cache.stats(), "calendar": calendar_cache.stats()}
+    for name, stats in caches.items():
+        samples.append((f"lms_{name}_cache_hits_total", "counter", f"{name} cache hits", stats["hits"]))
+        samples.append((f"lms_{name}_cache_misses_total", "counter", f"{name} cache misses", stats["misses"]))
+    return samples
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -26,6 +26,23 @@ async function apiRequest(url, method, body = null, token = null) {
     }
 }
 
+// Follow X-Next-Cursor pages of a list endpoint and return all rows
+async function apiRequestAllPages(url, token = null) {
+    const rows = [];
+    let after = null;
+    do {
+        const pageUrl = after ? `${url}${url.includes("?") ? "&" : "?"}after=${encodeURIComponent(after)}` : url;
+        const options = { method: "GET", headers: {} };
+        if (token) options.headers["Authorization"] = `Bearer ${token}`;
+        const res = await fetch(pageUrl, options);
+        const data = await res.json().catch(() => null);
+        if (!res.ok) throw new Error(data?.detail || data?.message || "Server Error");
+        rows.push(...(data || []));
+        after = res.headers.get("X-Next-Cursor");
+    } while (after);
+    return rows;
+}
+
 // ==========================
 // 🔹 Helpers
 // ==========================
@@ -269,7 +286,7 @@ async function loadPendingLeaves() {
     if (!token || !container) return;
 
     try {
-        const leaves = await apiRequest(`${MAN_DASH_BASE}/leave_requests`, "GET", null, token);
+        const leaves = await apiRequestAllPages(`${MAN_DASH_BASE}/leave_requests`, token);
         container.innerHTML = "";
         if (!leaves?.length) return container.innerHTML = "<p>No pending leave requests.</p>";
 
@@ -333,8 +350,8 @@ async function loadEmployees() {
 
     try {
         const [employees, leaveHistory] = await Promise.all([
-            apiRequest(`${MAN_DASH_BASE}/employees`, "GET", null, token),
-            apiRequest(`${MAN_DASH_BASE}/employee_leaves`, "GET", null, token)
+            apiRequestAllPages(`${MAN_DASH_BASE}/employees`, token),
+            apiRequestAllPages(`${MAN_DASH_BASE}/employee_leaves`, token)
         ]);
 
         tbody.innerHTML = "";
@@ -379,10 +396,26 @@ async function loadEmployees() {
 
 
 
-// Auto-refresh employee list
-setInterval(() => {
+// Live updates: SSE push from the server, polling only while it is unavailable
+function subscribeLeaveEvents(url, onChange, pollMs = 15000) {
+    const token = getToken();
+    if (!token) return;
+    let pollTimer = null;
+    const startPolling = () => { if (!pollTimer) pollTimer = setInterval(onChange, pollMs); };
+    if (!window.EventSource) return startPolling();
+
+    const source = new EventSource(`${url}?token=${encodeURIComponent(token)}`);
+    ["leave_created", "leave_approved", "leave_rejected"].forEach(type => source.addEventListener(type, onChange));
+    source.onopen = () => {
+        // (Re)connected: stop polling and catch up on anything missed meanwhile
+        if (pollTimer) { clearInterval(pollTimer); pollTimer = null; onChange(); }
+    };
+    source.onerror = startPolling; // EventSource keeps retrying in the background
+}
+
+function refreshEmployeeList() {
     if(document.getElementById("employeeListSection")?.classList.contains("active")) loadEmployees();
-}, 5000);
+}
 
 // Logout
 function logout() {
@@ -396,9 +429,11 @@ window.addEventListener("DOMContentLoaded", () => {
         loadEmployeeProfile();
         loadLeaveStatus();
         loadLeaveHistory();
+        subscribeLeaveEvents(`${EMP_DASH_BASE}/events`, () => { loadLeaveStatus(); loadLeaveHistory(); });
     } else if (window.location.pathname.includes("hr_dashboard")) {
         loadHRProfile();
         loadPendingLeaves();
         if(document.getElementById("employeeListSection")) loadEmployees();
+        subscribeLeaveEvents(`${MAN_DASH_BASE}/events`, () => { loadPendingLeaves(); refreshEmployeeList(); });
     }
 });